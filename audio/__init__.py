@@ -0,0 +1 @@
+"""Audio extraction from video files with ffmpeg."""
@@ -4,6 +4,7 @@ video files using ffmpeg.
 
 Classes:
     - AudioExtraction: A class for extracting audio from video files.
+    - ExtractJobQueue: A queue running audio extractions in the background.
 
 Exceptions:
     AudioExtractionError: If the audio track can't be extracted from the input video file.
@@ -13,52 +14,137 @@ Exceptions:
 Fields:
     - input_video_file_path: Path of input video file.
     - output_audio_file_path: Path of output audio file.
+    - language: Language of the audio track to extract, asked interactively when not given.
+    - threads: Number of threads ffmpeg may use (0 means all cores).
 
 Methods:
     - extract_audio: Extracts audio from video.
+    - extract_audio_to_array: Decodes audio from video into a NumPy array.
+
+Functions:
+    - extract_many: Extracts audio from several videos concurrently.
+    - gc_partials: Deletes stale partial audio files left by killed extractions.
+    - main: Extracts audio from the videos given on the command line, using a process pool.
 
 Usage:
 To extract audio from a video file,
-create an instance of AudioExtraction and call the extract_audio method:
+create an instance of AudioExtraction and await the extract_audio coroutine:
 ```
-from audio_extraction import AudioExtraction, AudioExtractionError
+import asyncio
+from audio.audio_extraction import AudioExtraction
+from exceptions.exceptions import AudioExtractionError
 
 try:
     audio_extractor = AudioExtraction('/path/to/video.mp4', '/path/to/audio.wav')
-    audio_extractor.extract_audio()
+    asyncio.run(audio_extractor.extract_audio())
 except AudioExtractionError as e:
     print('An error occurred while extracting audio:', e)
 ```
+From the command line, run the module from the repository root:
+```
+python -m audio.audio_extraction /path/to/video.mp4 /path/to/other.mkv
+```
 """
-import subprocess
+import argparse
+import asyncio
+import functools
+import json
+import multiprocessing
 import os
 import sys
+import time
+import uuid
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # pylint: disable=import-error, wrong-import-position
-from exceptions.exceptions import AudioExtractionError, InvalidLanguageChoiceError
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+import numpy as np
+from exceptions.exceptions import AudioExtractionError, InvalidLanguageChoiceError, SubtitlerError
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SAMPLE_RATE = 16000
+# Size of the buffer used to read a child process output. The default of 64 KiB makes
+# asyncio pause and resume the pipe many times per second while ffmpeg streams PCM,
+# which is especially slow on Windows pipes. communicate() also reads in chunks of this size.
+PIPE_BUFFER_SIZE = 1 << 20
+
+# Containers able to hold an audio track copied without re-encoding, by codec name,
+# as the file extension and the ffmpeg muxer writing it
+CODEC_CONTAINERS: Dict[str, Tuple[str, str]] = {
+    'aac': ('.aac', 'adts'),
+    'ac3': ('.ac3', 'ac3'),
+    'eac3': ('.eac3', 'eac3'),
+    'flac': ('.flac', 'flac'),
+    'mp3': ('.mp3', 'mp3'),
+    'opus': ('.opus', 'opus'),
+    'vorbis': ('.ogg', 'ogg'),
+    'pcm_s16le': ('.wav', 'wav'),
+}
+# Matroska audio can hold any codec
+DEFAULT_COPY_CONTAINER = ('.mka', 'matroska')
+
+# ffmpeg writes to the output path with this suffix appended, and the file is renamed
+# once complete, so a killed extraction never leaves a truncated file behind
+PART_SUFFIX = '.part'
+
+async def _run_command(command: List[str], stdout: int = asyncio.subprocess.PIPE) -> bytes:
+    """
+    Runs a command without a shell and waits for it to finish.
+
+    Parameters
+    ----------
+    command: list[str]
+        Program name followed by its arguments.
+    stdout: int
+        Where to send the standard output of the command.
+
+    Raises
+    ------
+    AudioExtractionError
+        If the program can't be found or exits with a non-zero status.
+
+    Returns
+    -------
+    bytes
+        Standard output of the command.
+    """
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command, stdout=stdout, stderr=asyncio.subprocess.PIPE, limit=PIPE_BUFFER_SIZE)
+    except FileNotFoundError as file_not_found_error:
+        raise AudioExtractionError(file_not_found_error) from file_not_found_error
+
+    output, errors = await process.communicate()
+    if process.returncode != 0:
+        raise AudioExtractionError(errors.decode('utf-8'))
+    return output or b''
+
 class AudioExtraction:
     """
     Audio Extraction from video.
 
     Attributes
     ----------
-    input_video_file_path: str
+    input_video_file_path: pathlib.Path
         Path of input video file.
-    output_audio_file_path: str
+    output_audio_file_path: pathlib.Path
         Path of output audio file.
+        Defaults to the input video file name with a .wav extension, next to it.
+    language: str, optional
+        Language of the audio track to extract. When not given, the user is asked to choose.
+    threads: int
+        Number of threads ffmpeg may use, 0 lets ffmpeg use every core.
+        Set a small value such as 2 when running many extractions in parallel,
+        so the ffmpeg processes don't oversubscribe the CPU.
 
     Methods
     -------
     get_language_choice(language_track_mapping: dict) -> str
         Get the language choice.
-    extract_audio() -> None
-        Extracts audio from video.
+    extract_audio(fast: bool = True) -> str
+        Extracts audio from video (coroutine).
+    extract_audio_to_array() -> numpy.ndarray
+        Decodes audio from video into memory (coroutine).
 
     Raises
     ------
@@ -70,9 +156,16 @@ class AudioExtraction:
         If the language choice is invalid.
     """
 
-    def __init__(self, input_video_file_path: str, output_audio_file_path: str) -> None:
-        self.input_video_file_path = input_video_file_path
-        self.output_audio_file_path = output_audio_file_path
+    def __init__(self, input_video_file_path: Union[str, Path],
+                 output_audio_file_path: Optional[Union[str, Path]] = None,
+                 language: Optional[str] = None, threads: int = 0) -> None:
+        self.input_video_file_path = Path(input_video_file_path)
+        # Path.stem only drops the last suffix, so My.Show.S01E01.mkv gives My.Show.S01E01.wav
+        self.output_audio_file_path = (
+            Path(output_audio_file_path) if output_audio_file_path is not None
+            else self.input_video_file_path.with_name(f"{self.input_video_file_path.stem}.wav"))
+        self.language = language
+        self.threads = threads
 
     def get_language_choice(self, language_track_mapping: Dict[str, str]) -> str:
         """
@@ -114,17 +207,94 @@ class AudioExtraction:
 
         return user_input
 
-    def extract_audio(self) -> None:
+    def _check_input_video_file(self) -> None:
+        """
+        Checks that the input video file exists.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the input video file doesn't exist.
+        """
+        if not self.input_video_file_path.is_file():
+            raise FileNotFoundError(
+                f"Input video file not found: {self.input_video_file_path}")
+
+    async def _select_audio_track(self) -> Tuple[str, str, str]:
+        """
+        Lists the audio tracks of the input video file and asks which one to use.
+
+        Raises
+        ------
+        AudioExtractionError
+            If the audio tracks can't be read from the input video file.
+        InvalidLanguageChoiceError
+            If the language choice is invalid.
+
+        Returns
+        -------
+        tuple[str, str, str]
+            Stream index, language and codec name of the chosen audio track.
+        """
+        # Initialize variables
+        language_choice: Optional[str] = self.language
+        language_track_mapping: Dict[str, str] = {}
+
+        # Execute ffprobe command to extract audio tracks information
+        command = [
+            'ffprobe',
+            '-v', 'error',
+            '-select_streams', 'a',
+            '-show_entries', 'stream=index,codec_name:stream_tags=language',
+            '-of', 'json',
+            str(self.input_video_file_path)
+        ]
+        try:
+            audio_streams = json.loads(await _run_command(command)).get('streams', [])
+        except json.JSONDecodeError as json_decode_error:
+            raise AudioExtractionError(
+                f"Could not read audio tracks of {self.input_video_file_path}: {json_decode_error}"
+            ) from json_decode_error
+        if not audio_streams:
+            raise AudioExtractionError(f"No audio tracks found in {self.input_video_file_path}")
+
+        # Create a language to track number mapping dictionary,
+        # untagged tracks are listed as "und" (undetermined)
+        language_track_mapping = {
+            stream.get('tags', {}).get('language', 'und'): str(stream['index'])
+            for stream in audio_streams
+        }
+        track_codec_mapping = {
+            str(stream['index']): stream.get('codec_name', '') for stream in audio_streams
+        }
+
+        # Validate language choice
+        if language_choice is None:
+            language_choice = self.get_language_choice(language_track_mapping)
+        if language_choice not in language_track_mapping:
+            raise InvalidLanguageChoiceError(f"Invalid language choice: {language_choice}")
+        track_number = language_track_mapping[language_choice]
+
+        logging.info("Track number: %s, Language: %s", track_number, language_choice)
+        return track_number, language_choice, track_codec_mapping[track_number]
+
+    async def extract_audio(self, fast: bool = True) -> str:
         """
         Extracts the audio track from the input video file.
 
         Parameters
         ----------
-        None
+        fast: bool
+            Copy the audio track as is, without re-encoding it.
+            The extension of the output audio file is replaced by one
+            matching the codec of the track (.aac, .opus, .mka, ...).
+            When False, the track is re-encoded to a 16 kHz mono PCM file at
+            the output audio file path, as speech recognition models expect.
 
         Returns
         -------
-        None
+        str
+            Path of the written audio file.
 
         Raises
         ------
@@ -135,103 +305,380 @@ class AudioExtraction:
         ValueError
             If the language choice is invalid.
         """
-        # Initialize variables
-        language_choice: Optional[str] = None
-        language_track_mapping: Dict[str, str] = {}
-        input_video_file = Path(self.input_video_file_path)
-
         # Check if the input video file exists
-        if not input_video_file.is_file():
-            raise FileNotFoundError(
-                f"Input video file not found: {input_video_file}")
+        self._check_input_video_file()
 
         # Check if the output directory exists
-        if not Path(self.output_audio_file_path).parent.is_dir():
+        if not self.output_audio_file_path.parent.is_dir():
             raise FileNotFoundError(
                 f"Output directory not found: {self.output_audio_file_path.parent}")
 
-        # Execute ffprobe command to extract audio tracks information
-        try:
-            command = [
-                'ffprobe',
-                '-v', 'error',
-                '-select_streams', 'a',
-                '-show_entries', 'stream=index:stream_tags=language',
-                '-of', 'default=nokey=1:noprint_wrappers=1',
-                self.input_video_file_path
+        track_number, language_choice, codec_name = await self._select_audio_track()
+
+        if fast:
+            # Demuxing is I/O bound, decoding and encoding again is CPU bound,
+            # so copy the track into a container that can hold its codec
+            extension, muxer = CODEC_CONTAINERS.get(codec_name, DEFAULT_COPY_CONTAINER)
+            output_audio_file_path = str(self.output_audio_file_path.with_suffix(extension))
+            codec_options = ['-c', 'copy']
+        else:
+            output_audio_file_path = str(self.output_audio_file_path)
+            muxer = 'wav'
+            codec_options = [
+                '-c:a', 'pcm_s16le',
+                '-ac', '1',
+                '-ar', str(SAMPLE_RATE),
+                '-filter_threads', str(self.threads)
             ]
-            audio_tracks_info: List[str] = []
-        except subprocess.CalledProcessError as ex:
-            raise AudioExtractionError(ex) from ex
+        partial_audio_file_path = output_audio_file_path + PART_SUFFIX
 
-        # Get the output of ffprobe command
+        # Execute ffmpeg command to extract audio track from the input video file,
+        # and save it to the output audio file.
+        # The muxer must be given explicitly since the partial file name has no known extension.
+        command = [
+            'ffmpeg',
+            '-hide_banner',
+            '-nostdin',
+            '-loglevel', 'warning',
+            '-threads', str(self.threads),
+            '-i', str(self.input_video_file_path),
+            '-map', f'0:{track_number}',
+            '-vn',
+            *codec_options,
+            '-f', muxer,
+            '-y', partial_audio_file_path
+        ]
         try:
-            audio_tracks_info = subprocess.check_output(
-                command, shell=True, stderr=subprocess.STDOUT).decode('utf-8').split('\n')
-        except subprocess.CalledProcessError as subprocess_error:
-            raise AudioExtractionError(
-                subprocess_error.output.decode('utf-8')
-            ) from subprocess_error
-        except FileNotFoundError as file_not_found_error:
-            raise AudioExtractionError(file_not_found_error) from file_not_found_error
-
-        # Remove empty elements from the output list and remove the '\r' character from each element
-        audio_tracks_info = [
-            track for track in audio_tracks_info if track != '']
-        # remove the \r character from each element
-        formatted_audio_tracks_info = [el.strip() for el in audio_tracks_info]
-
-        # Create a language to track number mapping dictionary
-        language_track_mapping = {}
-        for i in range(0, len(formatted_audio_tracks_info), 2):
-            language = formatted_audio_tracks_info[i + 1]
-            track_number = formatted_audio_tracks_info[i]
-            language_track_mapping[language] = track_number
+            await _run_command(command, stdout=asyncio.subprocess.DEVNULL)
+            os.replace(partial_audio_file_path, output_audio_file_path)
+        except BaseException:
+            Path(partial_audio_file_path).unlink(missing_ok=True)
+            raise
 
-        # Validate language choice
-        if language_choice is None:
-            language_choice = self.get_language_choice(language_track_mapping)
-        if language_choice not in language_track_mapping:
-            raise InvalidLanguageChoiceError(f"Invalid language choice: {language_choice}")
-        track_number = language_track_mapping[language_choice]
+        logging.info("Audio track: %s, audio_track_lang: %s extracted successfully to %s.",
+                     track_number, language_choice, output_audio_file_path)
+        return output_audio_file_path
 
-        logging.info("Track number: %s, Language: %s", track_number, language_choice)
+    async def extract_audio_to_array(self) -> np.ndarray:
+        """
+        Decodes the audio track of the input video file straight into memory,
+        without writing an intermediate audio file.
 
-        exit(0)
+        The track is resampled to 16 kHz mono signed 16-bit PCM,
+        which is what speech recognition models expect.
 
-        # Sanitize command
-        command = (
-            f'ffmpeg -i {self.input_video_file_path} '
-            f'-map 0:a:{track_number} '
-            f'-c copy {self.output_audio_file_path}'
-        )
+        Parameters
+        ----------
+        None
 
-        # Execute ffmpeg command to extract audio track from the input video file,
-        # and save it to the output audio file
+        Returns
+        -------
+        numpy.ndarray
+            Audio samples as int16.
+
+        Raises
+        ------
+        AudioExtractionError
+            If the audio track can't be extracted from the input video file.
+        FileNotFoundError
+            If the input video file doesn't exist.
+        ValueError
+            If the language choice is invalid.
+        """
+        # Check if the input video file exists
+        self._check_input_video_file()
+
+        track_number, language_choice, _ = await self._select_audio_track()
+
+        # Execute ffmpeg command to decode the audio track to raw PCM on stdout
+        command = [
+            'ffmpeg',
+            '-hide_banner',
+            '-nostdin',
+            '-loglevel', 'warning',
+            '-threads', str(self.threads),
+            '-i', str(self.input_video_file_path),
+            '-map', f'0:{track_number}',
+            '-vn',
+            '-f', 's16le',
+            '-acodec', 'pcm_s16le',
+            '-ac', '1',
+            '-ar', str(SAMPLE_RATE),
+            '-filter_threads', str(self.threads),
+            'pipe:1'
+        ]
+        samples = np.frombuffer(await _run_command(command), dtype=np.int16)
+
+        logging.info("Audio track: %s, audio_track_lang: %s decoded successfully (%d samples).",
+                     track_number, language_choice, len(samples))
+        return samples
+
+async def extract_many(paths: Iterable[Tuple[str, str]], language: str) -> None:
+    """
+    Extracts audio from several video files concurrently.
+
+    Parameters
+    ----------
+    paths: Iterable[tuple[str, str]]
+        Pairs of input video file path and output audio file path.
+    language: str
+        Language of the audio tracks to extract. Concurrent extractions can't prompt the user.
+
+    Raises
+    ------
+    AudioExtractionError
+        If the audio track can't be extracted from one of the input video files.
+    FileNotFoundError
+        If an input video file or output directory doesn't exist.
+    ValueError
+        If a language choice is invalid.
+    """
+    await asyncio.gather(*(
+        AudioExtraction(input_path, output_path, language=language).extract_audio()
+        for input_path, output_path in paths
+    ))
+
+def gc_partials(directory: str, max_age_s: float = 1800) -> int:
+    """
+    Deletes the partial audio files left in a directory by extractions that were killed.
+
+    Parameters
+    ----------
+    directory: str
+        Directory to clean.
+    max_age_s: float
+        Partial files modified more recently than this many seconds ago are kept,
+        since an extraction may still be writing them.
+
+    Returns
+    -------
+    int
+        Number of deleted files.
+    """
+    deleted = 0
+    cutoff = time.time() - max_age_s
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.name.endswith(PART_SUFFIX) or not entry.is_file():
+                continue
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+                    deleted += 1
+            except FileNotFoundError:
+                # Renamed or removed by its extraction in the meantime
+                continue
+    if deleted:
+        logging.info("Deleted %d stale partial audio files in %s", deleted, directory)
+    return deleted
+
+class ExtractJobQueue:
+    """
+    A queue running audio extractions in the background, so submitting one returns immediately.
+
+    Jobs wait in a bounded queue and at most `concurrency` of them run at the same time.
+    Submitting waits only while the queue is full, which pushes back on producers
+    instead of starting an unbounded number of ffmpeg processes.
+
+    Attributes
+    ----------
+    concurrency: int
+        Number of extractions allowed to run at the same time.
+
+    Methods
+    -------
+    submit(input_video_file_path: str, output_audio_file_path: str, language: str) -> str
+        Queues an extraction and returns its job id (coroutine).
+    get_result(job_id: str) -> str
+        Waits for an extraction and returns the path of the written audio file (coroutine).
+    close() -> None
+        Waits for the queued extractions and stops the background task (coroutine).
+
+    Usage
+    -----
+    ```
+    async with ExtractJobQueue() as queue:
+        job_id = await queue.submit('/path/to/video.mp4', '/path/to/audio.wav', 'eng')
+        audio_file_path = await queue.get_result(job_id)
+    ```
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, maxsize: int = 64) -> None:
+        self.concurrency = concurrency or max(1, (os.cpu_count() or 1) // 2)
+        self._queue: "asyncio.Queue[Tuple[str, AudioExtraction]]" = asyncio.Queue(maxsize=maxsize)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._results: Dict[str, "asyncio.Future[str]"] = {}
+        self._running: Set["asyncio.Task[None]"] = set()
+        self._dispatcher: Optional["asyncio.Task[None]"] = None
+
+    async def __aenter__(self) -> "ExtractJobQueue":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def submit(self, input_video_file_path: str, output_audio_file_path: str,
+                     language: str) -> str:
+        """
+        Queues the extraction of an audio track.
+
+        Parameters
+        ----------
+        input_video_file_path: str
+            Path of input video file.
+        output_audio_file_path: str
+            Path of output audio file.
+        language: str
+            Language of the audio track to extract. Background jobs can't prompt the user.
+
+        Returns
+        -------
+        str
+            Id of the job, to pass to get_result.
+        """
+        if self._dispatcher is None:
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        job_id = uuid.uuid4().hex
+        self._results[job_id] = asyncio.get_running_loop().create_future()
+        await self._queue.put((job_id, AudioExtraction(
+            input_video_file_path, output_audio_file_path, language=language)))
+        return job_id
+
+    async def get_result(self, job_id: str) -> str:
+        """
+        Waits for a queued extraction to finish.
+
+        Parameters
+        ----------
+        job_id: str
+            Id returned by submit.
+
+        Raises
+        ------
+        KeyError
+            If the job id is unknown, or its result was already returned.
+        AudioExtractionError
+            If the audio track can't be extracted from the input video file.
+        FileNotFoundError
+            If the input video file or output directory doesn't exist.
+        ValueError
+            If the language choice is invalid.
+
+        Returns
+        -------
+        str
+            Path of the written audio file.
+        """
+        result = await asyncio.shield(self._results[job_id])
+        del self._results[job_id]
+        return result
+
+    async def close(self) -> None:
+        """
+        Waits for every queued extraction to finish, then stops the background task.
+        """
+        await self._queue.join()
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+
+    async def _dispatch(self) -> None:
+        """
+        Takes jobs off the queue and starts them, as long as fewer than `concurrency` are running.
+        """
+        while True:
+            job_id, audio_extraction = await self._queue.get()
+            await self._semaphore.acquire()
+            task = asyncio.create_task(self._run(job_id, audio_extraction))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, job_id: str, audio_extraction: AudioExtraction) -> None:
+        """
+        Runs one job and stores its outcome for get_result.
+        """
+        result = self._results[job_id]
         try:
-            result = subprocess.run(
-                command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True, check=True)
-            if result.returncode != 0:
-                raise AudioExtractionError(result.stderr.decode('utf-8'))
-        except FileNotFoundError as file_not_found_error:
-            raise AudioExtractionError(file_not_found_error) from file_not_found_error
-        except subprocess.CalledProcessError as called_process_error:
-            raise AudioExtractionError(
-                called_process_error.stderr.decode('utf-8')
-            ) from called_process_error
+            result.set_result(await audio_extraction.extract_audio())
+        except Exception as error:  # pylint: disable=broad-except
+            result.set_exception(error)
+        finally:
+            self._semaphore.release()
+            self._queue.task_done()
+
+# Threads given to each ffmpeg process started by main, so that
+# cpu_count() // FFMPEG_THREADS_PER_WORKER workers saturate the CPU without thrashing
+FFMPEG_THREADS_PER_WORKER = 2
+
+def _extract_one(input_video_file_path: str, language: Optional[str] = None,
+                 threads: int = FFMPEG_THREADS_PER_WORKER) -> Optional[str]:
+    """
+    Extracts audio from one video file, for main.
 
-        logging.info("Audio track: %s, audio_track_lang: %s extracted successfully.",
-                     track_number, language_choice)
+    Parameters
+    ----------
+    input_video_file_path: str
+        Path of input video file.
+    language: str, optional
+        Language of the audio track to extract.
+    threads: int
+        Number of threads ffmpeg may use, 0 lets ffmpeg use every core.
 
-try:
+    Returns
+    -------
+    str, optional
+        Path of the written audio file, or None if the extraction failed.
+    """
     audio_extraction = AudioExtraction(
-        input_video_file_path="E:\\S01E01.mkv",
-        output_audio_file_path="E:\\S01E01_audio.wav"
+        input_video_file_path=input_video_file_path,
+        language=language,
+        threads=threads
     )
-    audio_extraction.extract_audio()
-except AudioExtractionError as error:
-    logging.error(error)
-except FileNotFoundError as error:
-    logging.error(error)
-except ValueError as error:
-    logging.error(error)
+    try:
+        return asyncio.run(audio_extraction.extract_audio())
+    except (SubtitlerError, FileNotFoundError, ValueError, EOFError) as error:
+        logging.error("%s: %s", input_video_file_path, error)
+        return None
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Extracts audio from the video files given on the command line,
+    running one ffmpeg per worker of a multiprocessing pool.
+
+    Parameters
+    ----------
+    argv: list[str], optional
+        Command line arguments, sys.argv[1:] when not given.
+
+    Returns
+    -------
+    int
+        Exit status, 0 if every file was extracted.
+    """
+    parser = argparse.ArgumentParser(description="Extract the audio track of video files.")
+    parser.add_argument("paths", nargs="+", help="video files to extract audio from")
+    parser.add_argument("-l", "--language",
+                        help="language of the audio track to extract, e.g. eng; "
+                             "asked interactively when a single file is given")
+    args = parser.parse_args(argv)
+    if len(args.paths) > 1 and args.language is None:
+        # Pool workers would hit the language prompt without a stdin to answer it
+        parser.error("--language is required when more than one file is given")
+
+    for directory in {Path(path).parent for path in args.paths}:
+        if directory.is_dir():
+            gc_partials(str(directory))
+
+    # Worker processes have no stdin to answer the language prompt,
+    # so a single file is extracted in this process, with every core to itself
+    if len(args.paths) == 1:
+        return 0 if _extract_one(args.paths[0], args.language, threads=0) else 1
+
+    processes = max(1, min((os.cpu_count() or 1) // FFMPEG_THREADS_PER_WORKER, len(args.paths)))
+    with multiprocessing.Pool(processes=processes) as pool:
+        results = pool.map(functools.partial(_extract_one, language=args.language), args.paths)
+    return 0 if all(results) else 1
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
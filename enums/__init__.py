@@ -0,0 +1 @@
+"""Enums describing subtitle files."""
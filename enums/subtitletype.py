@@ -13,11 +13,11 @@ Fields:
     - JSONL: This constant represents the JSONL subtitle type and has a string value of "jsonl".
     - UNKNOWN: This constant represents an unknown subtitle type and has a string value of "unknown".
 """
-from dataclasses import dataclass
+from enum import Enum
 from enums.uniquevalueenum import UniqueValueEnum
 
-@dataclass
-class SubtitleType(UniqueValueEnum):
+@UniqueValueEnum
+class SubtitleType(str, Enum):
     """
     An enumeration that defines the different types of subtitle files that can be used in a program.
     
@@ -40,7 +40,7 @@ class SubtitleType(UniqueValueEnum):
     @classmethod
     def is_valid(cls, subtitle_type: str) -> bool:
         """
-        This method checks if the given subtitle type is valid.
+        This method checks if the given subtitle type is valid, either as the value or as the name of a constant.
 
         Arguments:
             subtitle_type: The subtitle type to check.
@@ -51,13 +51,18 @@ class SubtitleType(UniqueValueEnum):
         Usage:
             >>> SubtitleType.is_valid("srt")
             True
+            >>> SubtitleType.is_valid("SRT")
+            True
             >>> SubtitleType.is_valid("invalid")
             False
         """
-        return subtitle_type in cls.__members__
+        return subtitle_type in _SUBTITLE_TYPES
     
     def __repr__(self):
         return f"{self.__class__.__name__}.{self.name}"
     
     def __str__(self):
         return self.value
+
+# Built once, so is_valid is a single set lookup
+_SUBTITLE_TYPES = frozenset(member.value for member in SubtitleType) | frozenset(SubtitleType.__members__)
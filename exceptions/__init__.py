@@ -0,0 +1 @@
+"""Exceptions raised by Subtitler."""
@@ -1,7 +1,8 @@
 """This module defines custom exception classes for handling errors in a Python application.
 
-The module defines two exception classes:
+The module defines the following exception classes:
 
+- SubtitlerError: The base class of every exception below, so callers can catch them all at once.
 - NoDotEnvFile: An exception that is raised when a `.env` file is not found.
 - UnknownException: An exception that is raised when an unknown or unexpected error occurs.
 - AudioExtractionError: An exception that is raised when an error occurs during audio extraction.
@@ -9,53 +10,74 @@ The module defines two exception classes:
 - TranslationError: An exception that is raised when an error occurs during translation.
 - FileReadError: An exception that is raised when an error occurs during file reading.
 - SubtitleTypeNotRecognized: An exception that is raised when the subtitle type is not recognized.
+- SRTParseError: An exception that is raised when an SRT file cannot be parsed.
+- InvalidEnumValueError: An exception that is raised when the value of an enum is invalid.
+- InvalidLanguageChoiceError: An exception that is raised when the user picks an invalid language.
 
 These exceptions can be used to provide more detailed error messages to users of the application.
+Every class declares empty `__slots__`, so raising one doesn't add any per-instance attributes.
 """
 
-class NoDotEnvFile(Exception):
+class SubtitlerError(Exception):
+    """
+    Base class for all exceptions raised by the application.
+    """
+    __slots__ = ()
+
+class NoDotEnvFile(SubtitlerError):
     """
     Exception raised when no `.env` file is found.
     """
+    __slots__ = ()
 
-class UnknownException(Exception):
+class UnknownException(SubtitlerError):
     """
     An exception class for handling unknown or unexpected errors.
     """
+    __slots__ = ()
 
-class AudioExtractionError(Exception):
+class AudioExtractionError(SubtitlerError):
     """
     An exception class for handling errors that occur during audio extraction.
     """
+    __slots__ = ()
 
-class SRTException(Exception):
+class SRTException(SubtitlerError):
     """
     An exception class for handling errors that occur during SRT processing.
     """
+    __slots__ = ()
 
-class TranslationError(Exception):
+class TranslationError(SubtitlerError):
     """
     An exception class for handling errors that occur during translation.
     """
+    __slots__ = ()
 
-class FileReadError(Exception):
+class FileReadError(SubtitlerError):
     """
     An exception class for handling errors that occur during file reading.
     """
+    __slots__ = ()
 
-class SubtitleTypeNotRecognized(Exception):
+class SubtitleTypeNotRecognized(SubtitlerError):
     """
     An exception class for handling errors that occur when the subtitle type is not recognized.
     """
+    __slots__ = ()
 
-class SRTParseError(Exception):
+class SRTParseError(SubtitlerError):
     """
     An exception class for handling errors that occur when the SRT file cannot be parsed.
     """
+    __slots__ = ()
 
-class InvalidEnumValueError(ValueError):
+class InvalidEnumValueError(SubtitlerError, ValueError):
     """
     Exception raised when the value of enum is invalid.
     """
-class InvalidLanguageChoiceError(Exception):
+    __slots__ = ()
+
+class InvalidLanguageChoiceError(SubtitlerError):
     """Raised when the user provides an invalid language choice."""
+    __slots__ = ()
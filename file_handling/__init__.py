@@ -0,0 +1 @@
+"""Reading subtitle files."""
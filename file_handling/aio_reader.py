@@ -0,0 +1,62 @@
+#pylint: disable=line-too-long
+"""
+Asynchronous wrappers around FileReader, for pipelines that read the next subtitle file while the previous one is still being translated.
+
+The blocking read is handed to the event loop's default executor, so the loop keeps serving in-flight translation requests in the meantime. Files up to ASYNC_READ_THRESHOLD bytes are read on the calling thread instead, since dispatching them to a worker costs more than the read itself.
+
+Functions:
+    read_async(path, stream): Reads a subtitle file without blocking the event loop.
+    run_blocking(func, *args): Runs a blocking call in the event loop's default executor.
+
+Usage:
+    >>> import asyncio
+    >>> from file_handling.aio_reader import read_async
+    >>> asyncio.run(read_async("path/to/subtitle.srt"))
+    {'type': 'SRT', 'data': [Subtitle(index=1, start=datetime.timedelta(seconds=10, microseconds=500000), end=datetime.timedelta(seconds=13), content="Look! It's a huge explosion!", proprietary='')]}
+"""
+from typing import Any, Callable, Dict, TypeVar, Union
+import asyncio
+import functools
+import os
+from file_handling.filereader import FileReader
+
+ASYNC_READ_THRESHOLD = 64 * 1024
+
+T = TypeVar("T")
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Runs a blocking call in the event loop's default executor.
+
+    Arguments:
+        func (Callable[..., T]): The blocking function to call.
+        *args (Any): The positional arguments to call it with.
+        **kwargs (Any): The keyword arguments to call it with.
+
+    Returns:
+        result (T): The result of the call.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+async def read_async(path: Union[str, os.PathLike], stream: bool = False) -> Dict[str, Any]:
+    """
+    Reads a subtitle file without blocking the event loop. Takes the same arguments, returns the same data and raises the same exceptions as FileReader.read().
+
+    Arguments:
+        path (Union[str, os.PathLike]): The path to the subtitle file.
+        stream (bool): Whether to return the SRT cues as an iterator instead of a list.
+
+    Returns:
+        data (Dict[str, Any]): A dictionary containing the subtitle file data.
+    """
+    reader = FileReader(path)
+    try:
+        size = os.stat(path).st_size
+    except OSError:
+        # Let read() raise the error it normally would
+        size = 0
+    if stream or size <= ASYNC_READ_THRESHOLD:
+        # A stream reads lazily as it is consumed, so there is nothing to hand off up front
+        return reader.read(stream=stream)
+    return await run_blocking(reader.read)
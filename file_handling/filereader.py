@@ -17,20 +17,358 @@ Returns:
     data (Dict[str, Union[str, List[Any]]]): A dictionary containing the subtitle file data.
 
 Usage:
-    >>> from subtitles import FileReader
+    >>> from file_handling.filereader import FileReader
     >>> file = FileReader("path/to/subtitle.srt")
     >>> file.read()
     {'type': SubtitleType.SRT, 'data': [Subtitle(index=1, start=datetime.timedelta(seconds=10, microseconds=500000), end=datetime.timedelta(seconds=13), content="Look! It's a huge explosion!", proprietary='')]} # #pylint: disable=line-too-long
 """
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, Iterator, List, Tuple, Union
 from pathlib import Path
+import codecs
+import copy
+import functools
+import itertools
+import mmap
 import os
-import sys
+import re
+import stat
 import srt
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) #pylint: disable=import-error, wrong-import-position
+try:
+    import srt_fast
+except ImportError:
+    srt_fast = None
+try:
+    import orjson
+except ImportError:
+    import json as orjson
+try:
+    from charset_normalizer import from_bytes
+except ImportError:
+    from_bytes = None
 from exceptions.exceptions import FileReadError, SubtitleTypeNotRecognized, SRTParseError
 from enums.subtitletype import SubtitleType
 
+# The encodings a subtitle file may be in. charset_normalizer only picks among these; without it
+# they are tried in this order, and as iso-8859-1 decodes any bytes, the encodings after it are
+# only reached through a byte order mark or zero bytes
+SUPPORTED_ENCODINGS = ['utf-8', 'UTF-8-SIG', 'ascii', 'cp1252', 'iso-8859-1',
+                       'utf-16', 'utf-16-le', 'utf-16-be', 'cp850', 'cp437']
+_BYTE_ORDER_MARKS = ((codecs.BOM_UTF8, 'UTF-8-SIG'),
+                     (codecs.BOM_UTF16_LE, 'utf-16'),
+                     (codecs.BOM_UTF16_BE, 'utf-16'))
+# Buffer size for reading subtitle files, large enough that big files take few read() calls
+READ_BUFFER_SIZE = 1 << 20
+# How much of the file the encoding detector looks at
+DETECTION_SAMPLE_SIZE = 64 * 1024
+
+# A run of blank lines, which ends a cue unless the text after it does not look like the start of
+# another one
+_CUE_SEPARATOR_RE = re.compile(rb"(?:\r?\n){2,}")
+_CUE_START_RE = re.compile(
+    r"\s*(?:-?[0-9]+\.?[0-9]*\s*\n)?\s*[0-9]+[,.:，．。：][0-9]+[,.:，．。：][0-9]+")
+
+def _parse_srt_text(text: str) -> List[srt.Subtitle]:
+    """
+    Parses SRT text with the srt_fast extension if it is installed, falling back to srt.parse
+    otherwise.
+
+    Arguments:
+        text (str): The SRT text to parse.
+
+    Returns:
+        subtitles (List[srt.Subtitle]): The parsed subtitles.
+
+    Raises:
+        ValueError: If srt_fast rejects the text.
+        srt.SRTParseError: If srt rejects the text.
+    """
+    if srt_fast is None:
+        return list(srt.parse(text))
+    return [
+        srt.Subtitle(index=cue.index, start=cue.start, end=cue.end,
+                     content=cue.content, proprietary=cue.proprietary)
+        for cue in srt_fast.parse(text)
+    ]
+
+def _decodes_head(head: bytes, encoding: str) -> bool:
+    """
+    Checks whether the start of a file decodes with an encoding.
+
+    Arguments:
+        head (bytes): The start of the file.
+        encoding (str): The encoding to check.
+
+    Returns:
+        decodes (bool): Whether the start of the file decodes.
+    """
+    try:
+        # Incremental, so that a character cut off at the end of the sample does not count as an
+        # error
+        codecs.getincrementaldecoder(encoding)().decode(head, final=False)
+    except UnicodeError:
+        # UnicodeError rather than UnicodeDecodeError, which the utf-16 codec does not raise for a
+        # missing byte order mark
+        return False
+    return True
+
+def _encoding_candidates(head: bytes) -> List[str]:
+    """
+    Lists the encodings a file without a byte order mark may be in, most likely first. Zero bytes
+    point to UTF-16 without a byte order mark, and the start of the file decoding as UTF-8 points to
+    UTF-8. Otherwise charset_normalizer, if installed, picks the encoding among the supported ones;
+    without it, the supported encodings that decode the start of the file follow in turn.
+
+    Arguments:
+        head (bytes): The start of the file.
+
+    Returns:
+        encodings (List[str]): The candidate encodings, each one of SUPPORTED_ENCODINGS.
+
+    Raises:
+        FileReadError: If charset_normalizer finds none of the supported encodings plausible.
+    """
+    if b"\x00" in head:
+        # UTF-16 without a byte order mark, which would otherwise pass for UTF-8: the ASCII
+        # characters of an SRT file have a zero byte on one side
+        return ["utf-16-le" if head[1::2].count(0) > head[::2].count(0) else "utf-16-be"]
+    if _decodes_head(head, "utf-8"):
+        return ["utf-8"]
+    if from_bytes is not None:
+        # Restricted to the supported encodings, so that a cp1251 or Shift-JIS file is rejected
+        # instead of passing for cp1252 or iso-8859-1
+        best_match = from_bytes(head, cp_isolation=SUPPORTED_ENCODINGS).best()
+        if best_match is None:
+            guess = from_bytes(head).best()
+            raise FileReadError(
+                f"File encoding is not supported: {guess.encoding if guess else 'unknown'}")
+        detected = codecs.lookup(best_match.encoding).name
+        return [encoding for encoding in SUPPORTED_ENCODINGS
+                if codecs.lookup(encoding).name == detected][:1]
+    # An encoding that does not fit usually fails on the start of the file already, without decoding
+    # all of it
+    return [encoding for encoding in SUPPORTED_ENCODINGS if _decodes_head(head, encoding)]
+
+def _decode(raw_data: bytes) -> Tuple[str, str]:
+    """
+    Detects the encoding of a subtitle file and decodes it. A byte order mark decides the encoding
+    outright; otherwise the candidates from _encoding_candidates are tried in turn on the whole
+    file.
+
+    Arguments:
+        raw_data (bytes): The contents of the file.
+
+    Returns:
+        result (Tuple[str, str]): The encoding, one of SUPPORTED_ENCODINGS, and the decoded text.
+
+    Raises:
+        FileReadError: If none of the supported encodings decodes the data.
+    """
+    for byte_order_mark, encoding in _BYTE_ORDER_MARKS:
+        if raw_data.startswith(byte_order_mark):
+            try:
+                return encoding, raw_data.decode(encoding)
+            except UnicodeDecodeError as unicode_decode_error:
+                raise FileReadError(f"File is not valid {encoding}") from unicode_decode_error
+
+    for encoding in _encoding_candidates(raw_data[:DETECTION_SAMPLE_SIZE]):
+        try:
+            return encoding, raw_data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    raise FileReadError("File encoding is not supported")
+
+@functools.lru_cache(maxsize=32)
+def _parse_srt(path: str,
+               mtime: int) -> Tuple[str, Tuple[srt.Subtitle, ...]]: #pylint: disable=unused-argument
+    """
+    Reads, decodes and parses an SRT file in a single pass. The result is cached, keyed on the path
+    and the modification time of the file, so reading an unchanged file again does not parse it
+    again.
+
+    Arguments:
+        path (str): The path to the SRT file.
+        mtime (int): The modification time of the file in nanoseconds, only used as part of the
+            cache key.
+
+    Returns:
+        result (Tuple[str, Tuple[srt.Subtitle, ...]]): The encoding of the file and the parsed
+            subtitles.
+
+    Raises:
+        FileReadError: If the file encoding is not supported.
+        ValueError: If srt_fast rejects the file.
+        srt.SRTParseError: If srt rejects the file.
+    """
+    with open(path, "rb", buffering=READ_BUFFER_SIZE) as file:
+        raw_data = file.read()
+    encoding, text = _decode(raw_data)
+    return encoding, tuple(_parse_srt_text(text))
+
+def _parse_cues(path: Path, text: str) -> List[srt.Subtitle]:
+    """
+    Parses the text of one or more cues, reporting parse errors as SRTParseError.
+
+    Arguments:
+        path (Path): The path to the SRT file, for the error message.
+        text (str): The SRT text to parse.
+
+    Returns:
+        subtitles (List[srt.Subtitle]): The parsed subtitles.
+
+    Raises:
+        SRTParseError: If the text is not valid SRT.
+    """
+    try:
+        return _parse_srt_text(text)
+    except (srt.SRTParseError, ValueError) as srt_parse_error:
+        raise SRTParseError(f"File could not be parsed: {path}") from srt_parse_error
+
+def _iter_srt(path: Path) -> Iterator[srt.Subtitle]:
+    """
+    Parses an SRT file one cue at a time, without reading the whole file into memory. The encoding
+    is detected from the start of the file like read() does; UTF-16 files, whose line breaks are not
+    single bytes, are decoded whole instead.
+
+    Arguments:
+        path (Path): The path to the SRT file.
+
+    Returns:
+        subtitles (Iterator[srt.Subtitle]): The parsed subtitles, in file order.
+
+    Raises:
+        FileReadError: If the file encoding is not supported, or the file does not decode with the
+            encoding detected from its start.
+        SRTParseError: If the file is not a valid SRT file.
+    """
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        head = mapped[:DETECTION_SAMPLE_SIZE]
+        if head.startswith(codecs.BOM_UTF8):
+            encoding, position = "utf-8", len(codecs.BOM_UTF8)
+        elif head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            encoding, position = "utf-16", 0
+        else:
+            candidates = _encoding_candidates(head)
+            if not candidates:
+                raise FileReadError(f"File encoding is not supported: {path}")
+            encoding, position = candidates[0], 0
+        if encoding.startswith("utf-16"):
+            _, text = _decode(mapped[:])
+            yield from _parse_cues(path, text)
+            return
+        separators = _CUE_SEPARATOR_RE.finditer(mapped, position)
+        try:
+            pending = ""
+            bounds = itertools.chain(((match.start(), match.end()) for match in separators),
+                                     [(len(mapped), len(mapped))])
+            for end, next_position in bounds:
+                try:
+                    block = mapped[position:end].decode(encoding)
+                except UnicodeDecodeError as unicode_decode_error:
+                    raise FileReadError(
+                        f"File is not valid {encoding}: {path}") from unicode_decode_error
+                if pending.strip() and _CUE_START_RE.match(block):
+                    yield from _parse_cues(path, pending)
+                    pending = ""
+                # The blank lines are kept as they are, since srt leaves all but the last two of
+                # them in the cue text
+                pending += block + mapped[end:next_position].decode("ascii")
+                position = next_position
+            if pending.strip():
+                yield from _parse_cues(path, pending)
+        finally:
+            # The regex scanner holds a buffer export, which keeps the mmap from closing if the
+            # caller stops early
+            del separators
+
+def _read_srt(path: Path, file_stat: os.stat_result,
+              stream: bool) -> Dict[str, Union[str, List[Any], Iterator[Any]]]:
+    """
+    Reads an SRT file.
+
+    Arguments:
+        path (Path): The path to the file.
+        file_stat (os.stat_result): The stat result of the file.
+        stream (bool): If True, the data is a generator that parses one cue at a time instead of a
+            list.
+
+    Returns:
+        data (Dict[str, Union[str, List[Any], Iterator[Any]]]): The file type and its subtitles.
+
+    Raises:
+        FileReadError: If the file encoding is not supported.
+        SRTParseError: If the file is not a valid SRT file.
+    """
+    if stream:
+        return {
+            "type": SubtitleType.SRT.name,
+            "data": _iter_srt(path)
+        }
+    try:
+        _, subtitles = _parse_srt(str(path.resolve()), file_stat.st_mtime_ns)
+    except (srt.SRTParseError, ValueError) as srt_parse_error:
+        raise SRTParseError(f"File could not be parsed: {path}") from srt_parse_error
+    # Callers edit the subtitles in place, so hand out copies rather than the cached objects
+    return {
+        "type": SubtitleType.SRT.name,
+        "data": [copy.copy(subtitle) for subtitle in subtitles]
+    }
+
+def _read_json(path: Path, file_stat: os.stat_result, stream: bool) -> Dict[str, Union[str, List[Any], Iterator[Any]]]: #pylint: disable=unused-argument,line-too-long
+    """
+    Reads a JSON file.
+
+    Arguments:
+        path (Path): The path to the file.
+        file_stat (os.stat_result): The stat result of the file.
+        stream (bool): Unused, JSON files are always read whole.
+
+    Returns:
+        data (Dict[str, Union[str, List[Any], Iterator[Any]]]): The file type and its decoded
+            document.
+
+    Raises:
+        FileReadError: If the file is not valid JSON.
+    """
+    with open(path, "rb", buffering=READ_BUFFER_SIZE) as file:
+        try:
+            return {
+                "type": SubtitleType.JSON.name,
+                "data": orjson.loads(file.read())
+            }
+        except ValueError as json_decode_error:
+            raise FileReadError(f"File could not be parsed: {path}") from json_decode_error
+
+def _read_jsonl(path: Path, file_stat: os.stat_result, stream: bool) -> Dict[str, Union[str, List[Any], Iterator[Any]]]: #pylint: disable=unused-argument,line-too-long
+    """
+    Reads a JSON Lines file.
+
+    Arguments:
+        path (Path): The path to the file.
+        file_stat (os.stat_result): The stat result of the file.
+        stream (bool): Unused, JSON Lines files are always read whole.
+
+    Returns:
+        data (Dict[str, Union[str, List[Any], Iterator[Any]]]): The file type and one decoded object
+            per non-blank line.
+
+    Raises:
+        FileReadError: If a line is not valid JSON.
+    """
+    with open(path, "rb", buffering=READ_BUFFER_SIZE) as file:
+        try:
+            return {
+                "type": SubtitleType.JSONL.name,
+                "data": [orjson.loads(line) for line in file if line.strip()]
+            }
+        except ValueError as json_decode_error:
+            raise FileReadError(f"File could not be parsed: {path}") from json_decode_error
+
+_READERS = {
+    ".srt": _read_srt,
+    ".json": _read_json,
+    ".jsonl": _read_jsonl,
+}
+
 class FileReader:
     """
     A class that reads a subtitle file and returns its data in a dictionary format.
@@ -40,6 +378,7 @@ class FileReader:
 
     Methods:
         read(): Reads the subtitle file data and returns it in a dictionary format.
+        iter_parse(): Parses an SRT file one cue at a time.
 
     Returns:
         data (Dict[str, Union[str, List[Any]]]): A dictionary containing the subtitle file data.
@@ -53,59 +392,54 @@ class FileReader:
     def __init__(self, path: Union[str, bytes, Path]) -> None:
         self.path = Path(path)
 
-    def read(self) -> Dict[str, Union[SubtitleType, List[Any]]]:
+    def read(self,
+             stream: bool = False) -> Dict[str, Union[SubtitleType, List[Any], Iterator[Any]]]:
         """
         Reads the subtitle file data and returns it in a dictionary format.
 
+        Arguments:
+            stream (bool): If True, the data of an SRT file is a generator that parses one cue at a
+                time from a memory-mapped file instead of a list.
+
         Returns:
-            data (Dict[str, Union[SubtitleType, List[Any]]]): A dictionary containing the subtitle file data.
+            data (Dict[str, Union[SubtitleType, List[Any]]]): A dictionary containing the subtitle
+                file data.
 
         Raises:
             SubtitleTypeNotRecognized: If the file type is not recognized.
             FileNotFoundError: If the file could not be found.
-            FileReadError: If the file could not be read.
+            FileReadError: If the file could not be read, or a JSON file could not be parsed.
             SRTParseError: If the file is not a valid SRT file.
         """
-        if not self.path.exists():
-            raise FileNotFoundError(f"File could not be found: {self.path.resolve()}")
+        try:
+            file_stat = self.path.stat()
+        except FileNotFoundError as file_not_found_error:
+            raise FileNotFoundError(
+                f"File could not be found: {self.path.resolve()}") from file_not_found_error
 
-        if self.path.suffix not in (".srt", ".json", ".jsonl"):
+        reader = _READERS.get(self.path.suffix.lower())
+        if reader is None:
             raise SubtitleTypeNotRecognized(f"File type not recognized: {self.path.suffix}")
 
-        if os.path.isfile(self.path) and os.path.getsize(self.path) > 0:
-            if self.path.suffix == ".srt":
-                if os.path.isfile(self.path) and os.path.getsize(self.path) > 0:
-                    with open(self.path, "r", encoding="utf-8") as file:
-                        try:
-                            return {
-                                "type": SubtitleType.SRT.name,
-                                "data": list(srt.parse(file.read()))
-                            }
-                        except srt.SRTParseError as srt_parse_error:
-                            raise SRTParseError(f"File could not be parsed: {self.path}") from srt_parse_error
-
-            elif self.path.suffix == ".json" or self.path.suffix == ".jsonl":
-                if os.path.isfile(self.path) and os.path.getsize(self.path) > 0:
-                    with open(self.path, "r", encoding="utf-8") as file:
-                        return {
-                            "type": SubtitleType.JSON.name if self.path.suffix == ".json" else SubtitleType.JSONL.name,
-                            "data": file.read()
-                        }
-                    
-        raise FileReadError(f"File could not be read: {self.path}")
-     
-# try:
-#     input_file = input("1 for JSON, 2 for SRT, 3 for none: ")
-#     if input_file == "1":
-#         fr = FileReader("../files/whisper-1-new.json")
-#     elif input_file == "2":
-#         fr = FileReader("test_en.srt")
-#     elif input_file == "3":
-#         exit()
-#     else:
-#         raise ValueError("Invalid input")
-#     data = fr.read()
-#     print(data)
-# except (UnknownException, FileNotFoundError, FileReadError) as exception:
-#     print(exception)
-#     raise exception
+        if not stat.S_ISREG(file_stat.st_mode) or file_stat.st_size == 0:
+            raise FileReadError(f"File could not be read: {self.path}")
+
+        return reader(self.path, file_stat, stream)
+
+    def iter_parse(self) -> Iterator[srt.Subtitle]:
+        """
+        Parses the SRT file one cue at a time, so that a caller can start working on the first
+        subtitles before the rest of the file is parsed.
+
+        Returns:
+            subtitles (Iterator[srt.Subtitle]): The parsed subtitles, in file order.
+
+        Raises:
+            SubtitleTypeNotRecognized: If the file is not an SRT file.
+            FileNotFoundError: If the file could not be found.
+            FileReadError: If the file could not be read.
+            SRTParseError: If the file is not a valid SRT file, raised while iterating.
+        """
+        if self.path.suffix.lower() != ".srt":
+            raise SubtitleTypeNotRecognized(f"File type not recognized: {self.path.suffix}")
+        return self.read(stream=True)["data"]
@@ -0,0 +1,74 @@
+//! Python bindings for the SRT parser in `parser.rs`.
+//!
+//! ```python
+//! import srt_fast
+//! subtitles = srt_fast.parse(text)
+//! subtitles[0].start  # datetime.timedelta
+//! ```
+
+mod parser;
+
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+use pyo3::types::PyDelta;
+
+/// One parsed subtitle block. `start` and `end` are `datetime.timedelta`s, like `srt.Subtitle`.
+#[pyclass(name = "Subtitle", module = "srt_fast", frozen, get_all)]
+pub struct PySubtitle {
+    index: Option<i64>,
+    start_ms: u64,
+    end_ms: u64,
+    content: String,
+    proprietary: String,
+}
+
+fn to_timedelta(py: Python<'_>, ms: u64) -> PyResult<&PyDelta> {
+    let seconds = ms / 1000;
+    let days = i32::try_from(seconds / 86_400).map_err(|_| PyValueError::new_err("timestamp out of range"))?;
+    PyDelta::new(py, days, (seconds % 86_400) as i32, ((ms % 1000) * 1000) as i32, true)
+}
+
+#[pymethods]
+impl PySubtitle {
+    #[getter]
+    fn start<'py>(&self, py: Python<'py>) -> PyResult<&'py PyDelta> {
+        to_timedelta(py, self.start_ms)
+    }
+
+    #[getter]
+    fn end<'py>(&self, py: Python<'py>) -> PyResult<&'py PyDelta> {
+        to_timedelta(py, self.end_ms)
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "Subtitle(index={:?}, start_ms={}, end_ms={}, content={:?})",
+            self.index, self.start_ms, self.end_ms, self.content
+        )
+    }
+}
+
+/// Parses SRT text into a list of `Subtitle`s. Raises `ValueError` on malformed input.
+#[pyfunction]
+fn parse(py: Python<'_>, text: &str) -> PyResult<Vec<PySubtitle>> {
+    let cues = py
+        .allow_threads(|| parser::parse(text))
+        .map_err(|error| PyValueError::new_err(error.to_string()))?;
+    Ok(cues
+        .into_iter()
+        .map(|cue| PySubtitle {
+            index: cue.index,
+            start_ms: cue.start_ms,
+            end_ms: cue.end_ms,
+            content: cue.content,
+            proprietary: cue.proprietary,
+        })
+        .collect())
+}
+
+#[pymodule]
+fn srt_fast(_py: Python<'_>, module: &PyModule) -> PyResult<()> {
+    module.add_class::<PySubtitle>()?;
+    module.add_function(wrap_pyfunction!(parse, module)?)?;
+    Ok(())
+}
@@ -0,0 +1,242 @@
+//! Single-pass SRT parser.
+//!
+//! Follows the same leniency rules as the pure-Python `srt` package, so both
+//! parsers accept the same files:
+//!
+//! - the index line is optional, and may be negative or have a fractional part;
+//! - timestamp fields are separated by any of `,.:，．。：`, and the milliseconds are optional;
+//! - lines may end with `\n` or `\r\n`, and the last block may miss its blank line;
+//! - blank lines inside the content are kept, unless what follows them looks like a new block.
+
+use memchr::memchr;
+
+/// One subtitle block.
+#[derive(Debug, Clone, PartialEq, Eq)]
+pub struct Cue {
+    pub index: Option<i64>,
+    pub start_ms: u64,
+    pub end_ms: u64,
+    pub proprietary: String,
+    pub content: String,
+}
+
+/// Error raised when the text is not valid SRT.
+#[derive(Debug, Clone, PartialEq, Eq)]
+pub struct ParseError {
+    /// 1-based number of the offending line.
+    pub line: usize,
+    pub message: String,
+}
+
+impl std::fmt::Display for ParseError {
+    fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+        write!(f, "line {}: {}", self.line, self.message)
+    }
+}
+
+impl std::error::Error for ParseError {}
+
+/// Splits `text` into lines without their `\n` / `\r\n` terminators.
+fn split_lines(text: &str) -> Vec<&str> {
+    let bytes = text.as_bytes();
+    let mut lines = Vec::with_capacity(bytes.len() / 16);
+    let mut pos = 0;
+    while pos < bytes.len() {
+        let end = memchr(b'\n', &bytes[pos..]).map_or(bytes.len(), |i| pos + i);
+        let line = &text[pos..end];
+        lines.push(line.strip_suffix('\r').unwrap_or(line));
+        pos = end + 1;
+    }
+    lines
+}
+
+fn is_blank(line: &str) -> bool {
+    line.trim().is_empty()
+}
+
+fn is_delimiter(c: char) -> bool {
+    matches!(c, ',' | '.' | ':' | '，' | '．' | '。' | '：')
+}
+
+/// Reads the ASCII digits at the start of `s`, returning their value and the rest of `s`.
+fn take_number(s: &str) -> Option<(u64, &str)> {
+    let len = s.bytes().take_while(u8::is_ascii_digit).count();
+    if len == 0 {
+        return None;
+    }
+    let mut value: u64 = 0;
+    for digit in s[..len].bytes() {
+        value = value.checked_mul(10)?.checked_add(u64::from(digit - b'0'))?;
+    }
+    Some((value, &s[len..]))
+}
+
+fn take_delimiter(s: &str) -> Option<&str> {
+    let c = s.chars().next()?;
+    if is_delimiter(c) {
+        Some(&s[c.len_utf8()..])
+    } else {
+        None
+    }
+}
+
+/// Reads an `HH:MM:SS,mmm` timestamp at the start of `s`,
+/// returning it in milliseconds and the rest of `s`.
+fn take_timestamp(s: &str) -> Option<(u64, &str)> {
+    let (hours, s) = take_number(s)?;
+    let (minutes, s) = take_number(take_delimiter(s)?)?;
+    let (seconds, s) = take_number(take_delimiter(s)?)?;
+    let s = take_delimiter(s).unwrap_or(s);
+    let (millis, s) = take_number(s).unwrap_or((0, s));
+    let total = hours
+        .checked_mul(60)?
+        .checked_add(minutes)?
+        .checked_mul(60)?
+        .checked_add(seconds)?
+        .checked_mul(1000)?
+        .checked_add(millis)?;
+    Some((total, s))
+}
+
+/// Parses a `start --> end [proprietary]` line.
+fn parse_timing_line(line: &str) -> Option<(u64, u64, &str)> {
+    let (start_ms, rest) = take_timestamp(line)?;
+    let rest = rest.trim_start_matches(' ');
+    let rest = rest.strip_prefix('-')?;
+    let rest = rest.strip_prefix(' ').or_else(|| rest.strip_prefix('-'))?;
+    let rest = rest.trim_start_matches(' ').strip_prefix('>')?;
+    let (end_ms, rest) = take_timestamp(rest.trim_start_matches(' '))?;
+    let proprietary = rest.strip_prefix(' ').unwrap_or(rest);
+    Some((start_ms, end_ms, proprietary))
+}
+
+/// Parses an index line, keeping only the integer part of indexes such as `123.4`.
+fn parse_index_line(line: &str) -> Option<i64> {
+    let line = line.trim();
+    let (negative, digits) = match line.strip_prefix('-') {
+        Some(rest) => (true, rest),
+        None => (false, line),
+    };
+    let (value, rest) = take_number(digits)?;
+    if let Some(fraction) = rest.strip_prefix('.') {
+        if !fraction.bytes().all(|b| b.is_ascii_digit()) {
+            return None;
+        }
+    } else if !rest.is_empty() {
+        return None;
+    }
+    let value = i64::try_from(value).ok()?;
+    Some(if negative { -value } else { value })
+}
+
+/// Whether a block starts at `lines[at]`, with or without its index line.
+fn starts_block(lines: &[&str], at: usize) -> bool {
+    match lines.get(at) {
+        None => false,
+        Some(line) if parse_timing_line(line.trim_start()).is_some() => true,
+        Some(line) => {
+            parse_index_line(line).is_some()
+                && lines
+                    .get(at + 1)
+                    .map_or(false, |next| parse_timing_line(next.trim_start()).is_some())
+        }
+    }
+}
+
+/// Parses a whole SRT document.
+pub fn parse(text: &str) -> Result<Vec<Cue>, ParseError> {
+    let text = text.strip_prefix('\u{feff}').unwrap_or(text);
+    let lines = split_lines(text);
+    let mut cues = Vec::with_capacity(lines.len() / 4);
+    let mut at = 0;
+
+    loop {
+        while at < lines.len() && is_blank(lines[at]) {
+            at += 1;
+        }
+        if at == lines.len() {
+            return Ok(cues);
+        }
+
+        let index = match parse_timing_line(lines[at].trim_start()) {
+            Some(_) => None,
+            None => match parse_index_line(lines[at]) {
+                Some(index) if starts_block(&lines, at) => {
+                    at += 1;
+                    Some(index)
+                }
+                _ => {
+                    return Err(ParseError {
+                        line: at + 1,
+                        message: format!("expected a subtitle index or timing, found {:?}", lines[at]),
+                    })
+                }
+            },
+        };
+
+        let (start_ms, end_ms, proprietary) = parse_timing_line(lines[at].trim_start())
+            .expect("block start was checked by starts_block");
+        at += 1;
+
+        let content_start = at;
+        while at < lines.len() {
+            if is_blank(lines[at]) {
+                let mut next = at;
+                while next < lines.len() && is_blank(lines[next]) {
+                    next += 1;
+                }
+                if next == lines.len() || starts_block(&lines, next) {
+                    break;
+                }
+            } else if at > content_start && starts_block(&lines, at) && parse_index_line(lines[at]).is_some() {
+                // A block directly following the previous one, without a blank line
+                break;
+            }
+            at += 1;
+        }
+
+        cues.push(Cue {
+            index,
+            start_ms,
+            end_ms,
+            proprietary: proprietary.to_owned(),
+            content: lines[content_start..at].join("\n"),
+        });
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn parses_blocks() {
+        let cues = parse("\u{feff}1\r\n00:00:01,500 --> 00:00:03,000\r\nHello\r\nthere\r\n\r\n2\r\n00:01:00,000 --> 01:00:00,001 X1:40\r\nBye\r\n").unwrap();
+        assert_eq!(
+            cues,
+            vec![
+                Cue { index: Some(1), start_ms: 1500, end_ms: 3000, proprietary: String::new(), content: "Hello\nthere".into() },
+                Cue { index: Some(2), start_ms: 60_000, end_ms: 3_600_001, proprietary: "X1:40".into(), content: "Bye".into() },
+            ]
+        );
+    }
+
+    #[test]
+    fn accepts_lenient_input() {
+        let cues = parse("00:00:01.5 --> 00:00:02\nno index\n\n\nstill content\n3.5\n00:00:03,000 --> 00:00:04,000\nnext\n").unwrap();
+        assert_eq!(cues.len(), 2);
+        assert_eq!(cues[0].index, None);
+        assert_eq!(cues[0].start_ms, 1005);
+        assert_eq!(cues[0].end_ms, 2000);
+        assert_eq!(cues[0].content, "no index\n\n\nstill content");
+        assert_eq!(cues[1].index, Some(3));
+        assert_eq!(cues[1].content, "next");
+    }
+
+    #[test]
+    fn rejects_garbage() {
+        let error = parse("\n\nnot a block\n1\n00:00:01,000 --> 00:00:02,000\nok\n").unwrap_err();
+        assert_eq!(error.line, 3);
+        assert!(parse("").unwrap().is_empty());
+    }
+}
@@ -0,0 +1 @@
+"""Translating subtitles."""
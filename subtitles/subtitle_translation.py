@@ -1,4 +1,4 @@
-# pylint: disable=logging-not-lazy, logging-fstring-interpolation,E1101
+# pylint: disable=E1101
 """
 This module provides a SubtitleTranslation class,
 that can be used to translate subtitle files from,
@@ -11,42 +11,499 @@ Exceptions:
     TranslationError: If an error occurs while translating the subtitles.
 
 Usage:
-    >>> from subtitle_translator import SubtitleTranslation
+    >>> from subtitles.subtitle_translation import SubtitleTranslation
     >>> translator = SubtitleTranslation("en", "de", "path/to/subtitle.srt")
     >>> translator.translate()
     >>> translator.save("path/to/translated_subtitle.srt")
 """
+import functools
+import hashlib
+import itertools
 import logging
 import os
-import sys
-from typing import Any, Dict, List
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import (IO, TYPE_CHECKING, Any, Dict, FrozenSet, Iterable, Iterator, List, Optional,
+                    Tuple, Union)
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from datetime import timedelta
 import srt
 from srt import Subtitle
-import langdetect
-from deep_translator import MyMemoryTranslator
-from deep_translator.exceptions import NotValidLength, NotValidPayload, TranslationNotFound
-from langdetect.lang_detect_exception import LangDetectException
 from enums.subtitletype import SubtitleType
 from exceptions.exceptions import TranslationError
 from file_handling.filereader import FileReader
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # pylint: disable=import-error, wrong-import-position
-
-SUPPORTED_ENCODINGS = ['utf-8', 'UTF-8-SIG', 'ascii', 'iso-8859-1',
-                       'utf-16', 'utf-16-le', 'utf-16-be', 'cp1252', 'cp850', 'cp437']
+from file_handling.aio_reader import run_blocking
+# deep_translator, requests, langdetect and fasttext take a noticeable share of a second to import,
+# so they are imported on first use
+if TYPE_CHECKING:
+    import requests
+    from deep_translator import MyMemoryTranslator
+    from langdetect.detector_factory import DetectorFactory
 
 logger = logging.getLogger(__name__)
 
+# Connections kept alive to MyMemory, enough for every translation worker
+HTTP_POOL_SIZE = 16
+
+def _pooled_session() -> "requests.Session":
+    """
+    Creates the HTTP session MyMemory requests go through. It keeps connections alive between
+    requests, so only the first request per connection pays for the TLS handshake, and retries
+    connection errors and throttled or failed responses with backoff.
+
+    Returns:
+        session (requests.Session): The session.
+    """
+    import requests  # pylint: disable=import-outside-toplevel,redefined-outer-name
+    from requests.adapters import HTTPAdapter  # pylint: disable=import-outside-toplevel
+    from urllib3.util.retry import Retry  # pylint: disable=import-outside-toplevel
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504),
+                  raise_on_status=False)
+    session.mount("https://", HTTPAdapter(pool_connections=HTTP_POOL_SIZE,
+                                          pool_maxsize=HTTP_POOL_SIZE, max_retries=retry))
+    return session
+
+class _PooledRequests: # pylint: disable=too-few-public-methods
+    """
+    Stands in for the requests module inside deep_translator.mymemory, which calls requests.get
+    directly and would otherwise open a new connection for every request.
+    """
+
+    def __init__(self) -> None:
+        self.session = _pooled_session()
+
+    def get(self, *args: Any, **kwargs: Any) -> "requests.Response":
+        """
+        Sends a GET request through the pooled session.
+
+        Returns:
+            response (requests.Response): The response.
+        """
+        return self.session.get(*args, **kwargs)
+
+@functools.lru_cache(maxsize=1)
+def _deep_translator() -> Any:
+    """
+    Imports deep_translator on first use and routes its MyMemory requests through the pooled
+    session.
+
+    Returns:
+        deep_translator (module): The deep_translator package.
+    """
+    import deep_translator  # pylint: disable=import-outside-toplevel
+    from deep_translator import mymemory  # pylint: disable=import-outside-toplevel
+    mymemory.requests = _PooledRequests()
+    return deep_translator
+
+# How much of the subtitle text is used to verify its language; the detectors converge well before
+# this
+LANGUAGE_SAMPLE_LENGTH = 2048
+# How many of the first subtitles the sample is taken from, so long files are not joined in full
+LANGUAGE_SAMPLE_CUES = 50
+
+# Path to a fasttext language identification model (e.g. lid.176.ftz); langdetect is used when unset
+FASTTEXT_MODEL_ENV = "SUBTITLER_FASTTEXT_MODEL"
+
+@functools.lru_cache(maxsize=1)
+def _load_language_model(path: str) -> Optional[Any]:
+    """
+    Loads a fasttext language identification model once per path.
+
+    Arguments:
+        path (str): The path to the model file.
+
+    Returns:
+        model (Optional[fasttext.FastText._FastText]): The loaded model, or None if fasttext is not
+            installed.
+
+    Raises:
+        ValueError: If the model could not be loaded.
+    """
+    try:
+        import fasttext  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return fasttext.load_model(path)
+
+# Frequent short words that are distinctive enough to recognise a language without running a
+# detector
+_STOPWORDS: Dict[str, FrozenSet[str]] = {
+    'en': frozenset({'the', 'and', 'is', 'you', 'that', 'it', 'of', 'to',
+                     'what', 'this', 'are', 'was', 'have', 'not', 'with'}),
+    'es': frozenset({'el', 'los', 'que', 'y', 'es', 'por', 'qué', 'una',
+                     'pero', 'está', 'con', 'para', 'no', 'lo', 'muy'}),
+    'fr': frozenset({'le', 'les', 'et', 'est', 'je', 'vous', 'pas', 'une',
+                     'que', 'il', 'dans', 'ce', 'qui', 'nous', 'avec'}),
+    'de': frozenset({'der', 'die', 'und', 'ist', 'ich', 'nicht', 'das', 'du',
+                     'ein', 'sie', 'mit', 'es', 'was', 'wir', 'auf'}),
+    'it': frozenset({'il', 'che', 'di', 'non', 'è', 'un', 'per', 'sono',
+                     'mi', 'gli', 'ha', 'questo', 'lo', 'ma', 'cosa'}),
+    'pt': frozenset({'o', 'os', 'que', 'não', 'um', 'uma', 'é', 'você',
+                     'eu', 'com', 'para', 'isso', 'do', 'da', 'está'}),
+    'nl': frozenset({'de', 'het', 'een', 'en', 'ik', 'niet', 'is', 'je',
+                     'dat', 'van', 'wat', 'zijn', 'we', 'op', 'met'}),
+}
+_WORD_RE = re.compile(r"[^\W\d_]+")
+# Words looked at by the stopword check, and how many of them it needs
+STOPWORD_SAMPLE_WORDS = 500
+STOPWORD_MIN_WORDS = 20
+
+def _guess_language_from_stopwords(text: str) -> Optional[str]:
+    """
+    Guesses the language of a text from its stopwords. Only answers when one language clearly
+    dominates, so that a None result means the text needs a real detector.
+
+    Arguments:
+        text (str): The text to guess the language of.
+
+    Returns:
+        language (Optional[str]): The ISO 639-1 code of the language, or None if the guess is
+            ambiguous.
+    """
+    words = _WORD_RE.findall(text.lower(), 0, STOPWORD_SAMPLE_WORDS * 16)[:STOPWORD_SAMPLE_WORDS]
+    if len(words) < STOPWORD_MIN_WORDS:
+        return None
+    hits = sorted(((sum(word in stopwords for word in words), language)
+                   for language, stopwords in _STOPWORDS.items()), reverse=True)
+    (best_hits, best_language), (second_hits, _) = hits[0], hits[1]
+    if best_hits >= len(words) // 8 and best_hits >= 3 * second_hits:
+        return best_language
+    return None
+
+# langdetect profiles loaded by default; the source language's own profile is added to these when
+# needed
+LANGDETECT_PROFILES: FrozenSet[str] = frozenset({
+    'en', 'es', 'ar', 'fr', 'de', 'it', 'pt', 'ru', 'ja', 'ko', 'zh-cn', 'zh-tw', 'hi', 'bn', 'id'
+})
+
+@functools.lru_cache(maxsize=8)
+def _langdetect_factory(languages: FrozenSet[str]) -> "DetectorFactory":
+    """
+    Builds a langdetect detector factory that only knows the given languages. Loading the full set
+    of profiles costs tens of megabytes, most of which no subtitle file needs.
+
+    Arguments:
+        languages (FrozenSet[str]): The langdetect profile names to load, e.g. "en" or "zh-cn";
+            names without a profile are skipped.
+
+    Returns:
+        factory (DetectorFactory): The detector factory.
+
+    Raises:
+        LangDetectException: If fewer than two of the profiles exist.
+    """
+    from langdetect.detector_factory import PROFILES_DIRECTORY, DetectorFactory  # pylint: disable=import-outside-toplevel,redefined-outer-name
+    profiles = []
+    for language in sorted(languages):
+        profile_path = os.path.join(PROFILES_DIRECTORY, language)
+        if os.path.isfile(profile_path):
+            with open(profile_path, "r", encoding="utf-8") as profile:
+                profiles.append(profile.read())
+    factory = DetectorFactory()
+    factory.load_json_profile(profiles)
+    factory.set_seed(0)
+    return factory
+
+def _run_language_detection(text: str, expected_language: Optional[str]) -> str:
+    """
+    Runs the language detection behind _detect_language, without caching.
+
+    Arguments:
+        text (str): The text to detect the language of.
+        expected_language (Optional[str]): The ISO 639-1 code of the language the text should be in.
+
+    Returns:
+        language (str): The ISO 639-1 code of the detected language.
+
+    Raises:
+        LangDetectException: If langdetect could not detect the language.
+        ValueError: If the fasttext model could not be loaded.
+    """
+    language = _guess_language_from_stopwords(text)
+    if language is not None:
+        return language
+    model_path = os.environ.get(FASTTEXT_MODEL_ENV)
+    model = _load_language_model(model_path) if model_path else None
+    if model is not None:
+        # fasttext predicts one line at a time
+        labels, _ = model.predict(text.replace("\n", " "), k=1)
+        return labels[0].replace("__label__", "", 1)
+    languages = LANGDETECT_PROFILES
+    if expected_language is not None:
+        languages = languages | {expected_language}
+        if expected_language == 'zh':
+            languages = languages | {'zh-cn', 'zh-tw'}
+    detector = _langdetect_factory(languages).create()
+    detector.append(text)
+    # langdetect tells Chinese variants apart (zh-cn, zh-tw); callers work with ISO 639-1 codes
+    return detector.detect().split("-")[0]
+
+DETECTION_CACHE_SIZE = 8192
+# Texts longer than this are cached under their digest rather than themselves
+DETECTION_KEY_LENGTH = 256
+_detection_cache: "OrderedDict[Tuple[Union[str, bytes], Optional[str], Optional[str]], str]" = (
+    OrderedDict())
+_detection_cache_lock = threading.Lock()
+
+def _detect_language(text: str, expected_language: Optional[str] = None) -> str:
+    """
+    Detects the language of a text. Results are cached, so detecting the same text again is a
+    dictionary lookup. Text whose stopwords clearly belong to one language is decided without a
+    detector; anything else goes to fasttext if it is installed and a model is configured in the
+    SUBTITLER_FASTTEXT_MODEL environment variable, and to langdetect otherwise.
+
+    Arguments:
+        text (str): The text to detect the language of.
+        expected_language (Optional[str]): The ISO 639-1 code of the language the text should be in,
+            so that langdetect loads its profile.
+
+    Returns:
+        language (str): The ISO 639-1 code of the detected language.
+
+    Raises:
+        LangDetectException: If langdetect could not detect the language.
+        ValueError: If the fasttext model could not be loaded.
+    """
+    model_path = os.environ.get(FASTTEXT_MODEL_ENV)
+    text_key: Union[str, bytes] = text
+    if len(text) > DETECTION_KEY_LENGTH:
+        text_key = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+    key = (text_key, expected_language, model_path)
+    with _detection_cache_lock:
+        if key in _detection_cache:
+            _detection_cache.move_to_end(key)
+            return _detection_cache[key]
+    language = _run_language_detection(text, expected_language)
+    with _detection_cache_lock:
+        _detection_cache[key] = language
+        while len(_detection_cache) > DETECTION_CACHE_SIZE:
+            _detection_cache.popitem(last=False)
+    return language
+
+@functools.lru_cache(maxsize=1)
+def _mymemory_codes() -> Dict[str, str]:
+    """
+    Builds the table from the language names and codes accepted for translation to MyMemory's locale
+    codes. MyMemory takes locales ("ja-JP", "en-GB") or deep_translator's language names
+    ("japanese"); ISO 639-1 codes ("ja") are mapped to the language's main locale, the one whose
+    region matches the code ("de-DE" rather than "de-AT") or else the first one listed.
+
+    Returns:
+        codes (Dict[str, str]): The MyMemory locale of every accepted name or code, keyed in lower
+            case.
+    """
+    languages = _deep_translator().constants.MY_MEMORY_LANGUAGES_TO_CODES
+    codes: Dict[str, str] = {}
+    for code in languages.values():
+        language = code.split("-")[0].lower()
+        if code.lower() == f"{language}-{language}" or language not in codes:
+            codes[language] = code
+    codes.update({code.lower(): code for code in languages.values()})
+    codes.update({name.lower(): code for name, code in languages.items()})
+    return codes
+
+def _mymemory_language(language: str) -> str:
+    """
+    Returns the MyMemory locale of a language.
+
+    Arguments:
+        language (str): An ISO 639-1 code ("ja"), a MyMemory locale ("ja-JP") or a language name
+            ("japanese").
+
+    Returns:
+        code (str): The MyMemory locale, e.g. "ja-JP".
+
+    Raises:
+        TranslationError: If MyMemory does not support the language.
+    """
+    code = _mymemory_codes().get(language.lower())
+    if code is None:
+        raise TranslationError(f"Language not supported: {language}")
+    return code
+
+# Matches text with nothing to translate: no letters, only whitespace, punctuation, symbols and
+# digits
+_SKIP_RE = re.compile(r"^[\s\W\d_]*$")
+# Formatting tags ("<i>", "</font>", "{\an8}"), whose letters are markup rather than text
+_TAG_RE = re.compile(r"<[^<>]*>|\{\\[^{}]*\}")
+
+# MyMemory rejects payloads of 500 characters or more, and counts its own limit in UTF-8 bytes; stay
+# below both
+MAX_BATCH_LENGTH = 450
+# Fewer cues per request keeps a mangled separator from costing a whole retranslation
+MAX_BATCH_SIZE = 25
+# How many batches are translated at the same time by default
+TRANSLATION_WORKERS = 8
+# Joins the cues of a batch, chosen so that the translation leaves it alone
+BATCH_SEPARATOR = "\n###SEP###\n"
+# How often a text MyMemory finds no translation for is sent before giving up, and the bounds of the
+# exponential backoff in between, in seconds
+TRANSLATION_ATTEMPTS = 3
+RETRY_INITIAL_DELAY = 0.5
+RETRY_MAX_DELAY = 5.0
+
+def _retry_delay(attempt: int) -> float:
+    """
+    Returns how long to wait before retrying a request: exponential in the number of failed
+    attempts, with random jitter so that parallel workers do not retry in lockstep.
+
+    Arguments:
+        attempt (int): How many attempts have failed so far, minus one.
+
+    Returns:
+        delay (float): The delay, in seconds.
+    """
+    return min(RETRY_MAX_DELAY,
+               RETRY_INITIAL_DELAY * 2 ** attempt + random.uniform(0, RETRY_INITIAL_DELAY))
+
+def _group_texts(texts: List[str], max_length: int, separator: str,
+                 max_size: int = MAX_BATCH_SIZE) -> List[List[str]]:
+    """
+    Groups consecutive texts so that each group, joined by a separator, stays within max_length
+    UTF-8 bytes and max_size texts. A text that is too long on its own gets a group of its own.
+
+    Arguments:
+        texts (List[str]): The texts to group.
+        max_length (int): The maximum length of a joined group, in UTF-8 bytes.
+        separator (str): The separator the groups are joined with.
+        max_size (int): The maximum number of texts in a group.
+
+    Returns:
+        groups (List[List[str]]): The groups, in order.
+    """
+    separator_length = len(separator.encode("utf-8"))
+    groups: List[List[str]] = []
+    group: List[str] = []
+    group_length = 0
+    for text in texts:
+        text_length = len(text.encode("utf-8"))
+        if group and (len(group) == max_size
+                      or group_length + separator_length + text_length > max_length):
+            groups.append(group)
+            group, group_length = [], 0
+        group_length += text_length + (separator_length if group else 0)
+        group.append(text)
+    if group:
+        groups.append(group)
+    return groups
+
+class _TranslationCache:
+    """
+    A thread-safe, bounded LRU cache of translations, keyed on the language pair and the source
+    text.
+
+    Arguments:
+        maxsize (int): The maximum number of translations to keep.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, source_language: str, target_language: str,
+                 texts: Iterable[str]) -> Dict[str, str]:
+        """
+        Looks up the cached translations of several texts.
+
+        Arguments:
+            source_language (str): The language of the texts.
+            target_language (str): The language of the translations.
+            texts (Iterable[str]): The texts to look up.
+
+        Returns:
+            translations (Dict[str, str]): The cached translations, keyed on text; texts without one
+                are left out.
+        """
+        translations = {}
+        with self._lock:
+            for text in texts:
+                key = (source_language, target_language, text)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    translations[text] = self._entries[key]
+        return translations
+
+    def put_many(self, source_language: str, target_language: str,
+                 translations: Dict[str, str]) -> None:
+        """
+        Stores several translations, evicting the least recently used ones beyond maxsize.
+
+        Arguments:
+            source_language (str): The language of the texts.
+            target_language (str): The language of the translations.
+            translations (Dict[str, str]): The translations to store, keyed on text.
+        """
+        with self._lock:
+            for text, translated_text in translations.items():
+                self._entries[(source_language, target_language, text)] = translated_text
+                self._entries.move_to_end((source_language, target_language, text))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+TRANSLATION_CACHE_SIZE = 4096
+_translation_cache = _TranslationCache(TRANSLATION_CACHE_SIZE)
+
+# Saved subtitles are written block by block; a large buffer turns them into a few big writes
+WRITE_BUFFER_SIZE = 1 << 20
+
+_TS_FMT = "{:02d}:{:02d}:{:02d},{:03d}".format
+
+def _fmt_td(timestamp: timedelta) -> str:
+    """
+    Formats a timedelta as an SRT timestamp, e.g. 01:23:04,500.
+
+    Arguments:
+        timestamp (timedelta): The timestamp to format.
+
+    Returns:
+        srt_timestamp (str): The formatted timestamp.
+    """
+    minutes, seconds = divmod(timestamp.days * 86400 + timestamp.seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return _TS_FMT(hours, minutes, seconds, timestamp.microseconds // 1000)
+
+def _compose(subtitles: List[Subtitle]) -> Iterator[str]:
+    """
+    Converts subtitles to SRT blocks like srt.compose, sorting and reindexing them, with a faster
+    timestamp formatter. The blocks are produced one at a time, so they can be written out without
+    building the whole file in memory.
+
+    Arguments:
+        subtitles (List[Subtitle]): The subtitles to convert.
+
+    Returns:
+        srt_blocks (Iterator[str]): The SRT block of each subtitle, in order.
+    """
+    return (
+        f"{subtitle.index}\n{_fmt_td(subtitle.start)} --> {_fmt_td(subtitle.end)}"
+        f"{' ' + subtitle.proprietary if subtitle.proprietary else ''}\n"
+        f"{srt.make_legal_content(subtitle.content)}\n\n"
+        for subtitle in srt.sort_and_reindex(subtitles)
+    )
+
 # TODO: organize everything into functions
 @contextmanager
-def open_file(path: str, mode: str = "r", encoding: str = "utf-8"):
+def open_file(path: str, mode: str = "r", encoding: str = "utf-8",
+              buffering: int = -1) -> Iterator[IO[str]]:
     """
-    The objective of the open_file function is to provide a context manager that opens a file, yields it to the caller, and then closes it after the caller is done with it. This function is useful for ensuring that files are properly closed after use, even if an error occurs during file processing.
+    The objective of the open_file function is to provide a context manager that opens a file,
+    yields it to the caller, and then closes it after the caller is done with it. This function is
+    useful for ensuring that files are properly closed after use, even if an error occurs during
+    file processing.
 
     Inputs:
         - path (str): a string representing the path to the file to be opened
-        - mode (str): a string representing the mode in which the file should be opened (default is "r" for read mode)
+        - mode (str): a string representing the mode in which the file should be opened (default is
+          "r" for read mode)
         - encoding (str): a string representing the encoding of the file (default is "utf-8")
+        - buffering (int): the buffer size passed on to open() (default is -1 for the system
+          default)
 
     Flow:
         1. The function takes in the path, mode, and encoding parameters.
@@ -59,11 +516,13 @@ def open_file(path: str, mode: str = "r", encoding: str = "utf-8"):
 
     Additional aspects:
         - The function uses the contextmanager decorator to create a context manager.
-        - The function uses a try-finally block to ensure that the file is closed after use, even if an error occurs during file processing.
-        - The function defaults to opening files in read mode with utf-8 encoding, but these parameters can be changed by the caller.
+        - The function uses a try-finally block to ensure that the file is closed after use, even if
+          an error occurs during file processing.
+        - The function defaults to opening files in read mode with utf-8 encoding, but these
+          parameters can be changed by the caller.
     """ # pylint: disable=line-too-long
     try:
-        file = open(path, mode, encoding=encoding)
+        file = open(path, mode, buffering, encoding=encoding)
         yield file
     finally:
         file.close()
@@ -76,25 +535,40 @@ class SubtitleTranslation:
         TranslationError: If an error occurs while translating the subtitles.
 
     Attributes:
-        source_language (str): The source language of the subtitles.
-        target_language (str): The target language to which the subtitles should be translated.
+        source_language (str): The source language of the subtitles, as an ISO 639-1 code ("ja"), a
+            MyMemory locale ("ja-JP") or a language name ("japanese").
+        target_language (str): The target language to which the subtitles should be translated, in
+            any of the same forms.
         srt_file (str): The path to the subtitle file that should be translated.
+        max_workers (int): How many translation requests may be in flight at the same time.
+        verify_language (bool): Whether to check that the subtitles are in the source language
+            before translating them.
+        keep_untranslated (bool): Whether a text that cannot be translated is kept as it is instead
+            of failing the whole file.
+        untranslated (List[str]): The texts of the last translation that were kept as they are.
 
     Methods:
         translate(): Translates the captions in the subtitle file to the target language.
         save(): Saves the translated subtitle file to the specified path.
 
     Usage:
-        >>> from subtitle_translator import SubtitleTranslation
+        >>> from subtitles.subtitle_translation import SubtitleTranslation
         >>> translator = SubtitleTranslation("en", "de", "path/to/subtitle.srt")
         >>> translator.translate()
         >>> translator.save("path/to/translated_subtitle.srt")
     """
 
-    def __init__(self, source_language: str, target_language: str, srt_file: str) -> None:
+    def __init__(self, source_language: str, target_language: str, srt_file: str, # pylint: disable=too-many-arguments
+                 max_workers: int = TRANSLATION_WORKERS, verify_language: bool = False,
+                 keep_untranslated: bool = False) -> None:
         self.source_language = source_language
         self.target_language = target_language
         self.srt_file = srt_file
+        self.max_workers = max_workers
+        self.verify_language = verify_language
+        self.keep_untranslated = keep_untranslated
+        self.untranslated: List[str] = []
+        self._local = threading.local()
 
     def translate(self) -> str:
         """
@@ -104,58 +578,238 @@ class SubtitleTranslation:
             The path to the translated subtitle file.
 
         Raises:
-            TranslationError: If an error occurs while translating the subtitles.
+            TranslationError: If an error occurs while translating the subtitles, or verify_language
+                is set and the subtitles are not in the source language.
         """
         file = FileReader(self.srt_file)
         data: Dict[str, Any] = file.read()
 
         if data["type"] == SubtitleType.JSON.name or data["type"] == SubtitleType.JSONL.name:
-            print("translate() json")
+            logger.debug("Skipping %s: JSON subtitles are not translated yet.", self.srt_file)
             # TODO: do processing (JSON)
         elif data["type"] == SubtitleType.SRT.name:
             srt_contents: List[Subtitle] = data["data"]
-            content, translated_content = [], []
-
-            for sub in srt_contents:
-                content.append(sub.content)
-
-            try:
-                detected_language = langdetect.detect(" ".join(content))
-            except LangDetectException as langdetect_exception:
-                logger.exception("Could not detect language.")
-                raise TranslationError(
-                    "Could not detect language.") from langdetect_exception
-            logger.debug(f"Detected language: {detected_language}")
-
-            if detected_language != self.source_language:
-                logger.warning(
-                    f"Detected language ({detected_language}) does not match source language ({self.source_language}).") # pylint: disable=line-too-long
-                raise TranslationError(
-                    f"Detected language ({detected_language}) does not match source language ({self.source_language}).") # pylint: disable=line-too-long
 
-            for subtitle_content in content:
+            if self.verify_language:
+                from langdetect.lang_detect_exception import LangDetectException  # pylint: disable=import-outside-toplevel
+                # The detectors answer in ISO 639-1, whichever form the source language was given in
+                source_language = _mymemory_language(self.source_language).split("-")[0].lower()
                 try:
-                    translated_subtitle = MyMemoryTranslator(
-                        source=self.source_language,
-                        target=self.target_language,
-                    ).translate(subtitle_content)
-                except (NotValidLength, NotValidPayload, TranslationNotFound) as translation_exception: # pylint: disable=line-too-long
-                    logger.exception("Could not translate subtitle.")
+                    sample = " ".join(subtitle.content for subtitle in
+                                      itertools.islice(srt_contents, LANGUAGE_SAMPLE_CUES))
+                    detected_language = _detect_language(sample[:LANGUAGE_SAMPLE_LENGTH],
+                                                         source_language)
+                except (LangDetectException, ValueError) as langdetect_exception:
+                    logger.exception("Could not detect language.")
                     raise TranslationError(
-                        f"Could not translate subtitle: {subtitle_content}"
-                    ) from translation_exception
-                logger.debug(
-                    f"Translated: {subtitle_content} -> {translated_subtitle}")
-                logger.debug("")
-                translated_content.append(translated_subtitle)
+                        "Could not detect language.") from langdetect_exception
+                logger.debug("Detected language: %s", detected_language)
+
+                if detected_language != source_language:
+                    logger.warning(
+                        "Detected language (%s) does not match source language (%s).",
+                        detected_language, self.source_language)
+                    raise TranslationError(
+                        f"Detected language ({detected_language}) does not match source language ({self.source_language}).") # pylint: disable=line-too-long
+
+            translations = self._translate_unique(
+                dict.fromkeys(subtitle.content for subtitle in srt_contents))
 
-            for i, subtitle in enumerate(srt_contents):
-                subtitle.content = translated_content[i]
+            for subtitle in srt_contents:
+                subtitle.content = translations[subtitle.content]
             self.srt_file = srt_contents
             return str(self.srt_file)
         else:
             raise TranslationError(f"Could not read file: {self.srt_file}")
 
+    def translate_batch(self, texts: List[str]) -> List[str]:
+        """
+        Translates a list of texts to the target language, sending as many of them per request as
+        MyMemory accepts.
+
+        Arguments:
+            texts (List[str]): The texts to translate.
+
+        Returns:
+            translated_texts (List[str]): The translations, in the same order as the texts.
+
+        Raises:
+            TranslationError: If a language is not supported, or a text could not be translated.
+        """
+        translations = self._translate_unique(dict.fromkeys(texts))
+        return [translations[text] for text in texts]
+
+    def _translate_unique(self, unique_texts: Dict[str, None]) -> Dict[str, str]:
+        """
+        Translates each distinct text once, skipping the ones without letters and the ones already
+        cached.
+
+        Arguments:
+            unique_texts (Dict[str, None]): The distinct texts to translate, in order.
+
+        Returns:
+            translations (Dict[str, str]): The translation of every text.
+
+        Raises:
+            TranslationError: If a language is not supported, or a text could not be translated.
+        """
+        for language in (self.source_language, self.target_language):
+            _mymemory_language(language)
+        self.untranslated = []
+        # Lines without any letters outside their tags ("", "♪♪", "...", "1984", "<i>♪</i>") are
+        # kept as they are
+        translations = {text: text for text in unique_texts
+                        if _SKIP_RE.match(_TAG_RE.sub("", text))}
+        # Repeated lines ("Yes.", "[Music]", speaker names) are translated once, and lines seen
+        # before not at all
+        translations.update(_translation_cache.get_many(
+            self.source_language, self.target_language,
+            (text for text in unique_texts if text not in translations)))
+        missing = [text for text in unique_texts if text not in translations]
+        groups = _group_texts(missing, MAX_BATCH_LENGTH, BATCH_SEPARATOR)
+        if groups:
+            # Imported here rather than by several worker threads at once
+            _deep_translator()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._translate_group, group) for group in groups]
+            try:
+                translated_missing = [translated_text for future in futures
+                                      for translated_text in future.result()]
+            except TranslationError:
+                executor.shutdown(cancel_futures=True)
+                raise
+        new_translations = dict(zip(missing, translated_missing))
+        # Texts kept as they are must not be cached as their own translation
+        untranslated = set(self.untranslated)
+        _translation_cache.put_many(self.source_language, self.target_language, {
+            text: translated_text for text, translated_text in new_translations.items()
+            if text not in untranslated
+        })
+        translations.update(new_translations)
+        return translations
+
+    def _translate_group(self, group: List[str]) -> List[str]:
+        """
+        Translates a group of texts in a single request, falling back to one request per text if the
+        separators do not survive the translation.
+
+        Arguments:
+            group (List[str]): The texts to translate.
+
+        Returns:
+            translated_texts (List[str]): The translations, in the same order as the texts.
+
+        Raises:
+            TranslationError: If a text could not be translated.
+        """
+        translator = self._translator()
+        if len(group) > 1:
+            try:
+                translated_batch = self._translate_text(translator, BATCH_SEPARATOR.join(group))
+            except TranslationError:
+                logger.debug("Batch of %d subtitles could not be translated, "
+                             "translating them one by one.", len(group))
+            else:
+                translated_texts = [text.strip() for text in
+                                    translated_batch.split(BATCH_SEPARATOR.strip())]
+                if len(translated_texts) == len(group):
+                    return translated_texts
+                logger.debug("Batch separators were lost in translation, "
+                             "translating %d subtitles one by one.", len(group))
+        return [self._translate_or_keep(translator, text) for text in group]
+
+    def _translate_or_keep(self, translator: "MyMemoryTranslator", text: str) -> str:
+        """
+        Translates a single text. If it cannot be translated and keep_untranslated is set, it is
+        kept as it is and recorded in untranslated.
+
+        Arguments:
+            translator (MyMemoryTranslator): The translator to use.
+            text (str): The text to translate.
+
+        Returns:
+            translated_text (str): The translation, or the text itself.
+
+        Raises:
+            TranslationError: If the text could not be translated and keep_untranslated is not set.
+        """
+        try:
+            return self._translate_text(translator, text)
+        except TranslationError:
+            if not self.keep_untranslated:
+                logger.exception("Could not translate subtitle.")
+                raise
+            logger.warning("Could not translate subtitle, keeping it as it is: %s", text)
+            self.untranslated.append(text)
+            return text
+
+    def _translator(self) -> "MyMemoryTranslator":
+        """
+        Returns the translator of the current thread, creating it on first use. MyMemoryTranslator
+        keeps per-request state, so threads must not share one.
+
+        Returns:
+            translator (MyMemoryTranslator): The translator of the current thread.
+        """
+        translator = getattr(self._local, "translator", None)
+        if translator is None:
+            deep_translator = _deep_translator()
+            try:
+                translator = self._local.translator = deep_translator.MyMemoryTranslator(
+                    source=_mymemory_language(self.source_language),
+                    target=_mymemory_language(self.target_language),
+                )
+            except deep_translator.exceptions.LanguageNotSupportedException as language_exception:
+                raise TranslationError(
+                    f"Language not supported: {self.source_language} -> {self.target_language}"
+                ) from language_exception
+        return translator
+
+    def _translate_text(self, translator: "MyMemoryTranslator", text: str) -> str:
+        """
+        Translates a single payload, retrying with exponential backoff while MyMemory finds no
+        translation, throttles the requests or fails to answer.
+
+        Arguments:
+            translator (MyMemoryTranslator): The translator to use.
+            text (str): The text to translate.
+
+        Returns:
+            translated_text (str): The translation.
+
+        Raises:
+            TranslationError: If the text could not be translated.
+        """
+        from requests import RequestException  # pylint: disable=import-outside-toplevel
+        exceptions = _deep_translator().exceptions
+        # deep_translator raises StopIteration rather than TranslationNotFound when MyMemory answers
+        # without a translation
+        retried = (exceptions.TranslationNotFound, exceptions.TooManyRequests,
+                   exceptions.RequestError, RequestException, StopIteration)
+        for attempt in range(TRANSLATION_ATTEMPTS):
+            try:
+                translated_text = translator.translate(text)
+                if not translated_text:
+                    raise exceptions.TranslationNotFound(text)
+                break
+            except retried as translation_exception:
+                if attempt + 1 == TRANSLATION_ATTEMPTS:
+                    raise TranslationError(
+                        f"Could not translate subtitle: {text}"
+                    ) from translation_exception
+                delay = _retry_delay(attempt)
+                logger.debug("Translation failed (%r), retrying in %.2f seconds.",
+                             translation_exception, delay)
+                time.sleep(delay)
+            except (exceptions.NotValidLength, exceptions.NotValidPayload) as translation_exception:
+                raise TranslationError(
+                    f"Could not translate subtitle: {text}"
+                ) from translation_exception
+        # Called once per text, so skip building the log record entirely unless someone is listening
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Translated: %s -> %s", text, translated_text)
+        return translated_text
+
     def save(self, path: str) -> None:
         """
         Saves the current SRT data to a file.
@@ -167,14 +821,27 @@ class SubtitleTranslation:
             IOError: If the file could not be saved.
         """
         try:
-            with open_file(path, "w") as file:
-                file.write(srt.compose(self.srt_file))
+            with open_file(path, "w", buffering=WRITE_BUFFER_SIZE) as file:
+                file.writelines(_compose(self.srt_file))
         except IOError as io_error:
             logger.exception("Could not save file.")
             raise IOError("Could not save file.") from io_error
 
-os.system("cls")
-st = SubtitleTranslation("ja", "en", "test_ja.srt")
-TRANSLATION = st.translate()
-st.save("test_en.srt")
-print(TRANSLATION)
+    async def save_async(self, path: str) -> None:
+        """
+        Saves the current SRT data to a file without blocking the event loop.
+
+        Args:
+            path (str): The path to the file to save.
+
+        Raises:
+            IOError: If the file could not be saved.
+        """
+        await run_blocking(self.save, path)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    st = SubtitleTranslation("ja", "en", "test_ja.srt")
+    TRANSLATION = st.translate()
+    st.save("test_en.srt")
+    print(TRANSLATION)
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # pylint: disable=import-error, wrong-import-position
+from file_handling import aio_reader
+from file_handling.aio_reader import read_async, run_blocking
+from file_handling.filereader import FileReader
+
+import pytest
+
+"""
+Code Analysis
+
+Main functionalities:
+read_async reads a subtitle file like FileReader.read(), handing files larger than ASYNC_READ_THRESHOLD to the event loop's default executor so the loop is not blocked. run_blocking runs any blocking call in that executor.
+"""
+
+SRT_CUE = "{index}\n00:00:01,000 --> 00:00:02,000\nHello\n\n"
+
+def write_srt(tmp_path, cues):
+    """
+    Writes an SRT file with the given number of cues and returns its path.
+    """
+    path = tmp_path / "subtitle.srt"
+    path.write_text("".join(SRT_CUE.format(index=index) for index in range(1, cues + 1)), encoding="utf-8")
+    return path
+
+class TestAioReader:
+
+    # Tests that run_blocking runs the call on a worker thread and returns its result.
+    def test_run_blocking_runs_in_executor(self):
+        """
+        Tests that run_blocking runs the call on a worker thread, passing its positional and keyword arguments, and returns its result.
+        """
+        def call(value, *, offset):
+            return threading.get_ident(), value + offset
+
+        thread_id, result = asyncio.run(run_blocking(call, 1, offset=2))
+        assert result == 3
+        assert thread_id != threading.get_ident()
+
+    # Tests that a small file is read on the calling thread.
+    def test_read_async_small_file_is_read_inline(self, mocker, tmp_path):
+        """
+        Tests that a file up to ASYNC_READ_THRESHOLD bytes is read on the calling thread, and gives the same data as FileReader.read().
+        """
+        path = write_srt(tmp_path, 2)
+        run_blocking_mock = mocker.patch.object(aio_reader, "run_blocking")
+        assert asyncio.run(read_async(path)) == FileReader(path).read()
+        run_blocking_mock.assert_not_called()
+
+    # Tests that a large file is read in the executor.
+    def test_read_async_large_file_is_read_in_executor(self, mocker, tmp_path):
+        """
+        Tests that a file larger than ASYNC_READ_THRESHOLD bytes is handed to the executor, and gives the same data as FileReader.read().
+        """
+        mocker.patch.object(aio_reader, "ASYNC_READ_THRESHOLD", 64)
+        path = write_srt(tmp_path, 10)
+        run_blocking_spy = mocker.spy(aio_reader, "run_blocking")
+        assert asyncio.run(read_async(path)) == FileReader(path).read()
+        run_blocking_spy.assert_called_once()
+
+    # Tests that streaming a file asynchronously gives an iterator over its cues.
+    def test_read_async_stream_returns_iterator(self, mocker, tmp_path):
+        """
+        Tests that with stream=True the data is an iterator over the cues, which is not handed to the executor whatever the file size.
+        """
+        mocker.patch.object(aio_reader, "ASYNC_READ_THRESHOLD", 64)
+        path = write_srt(tmp_path, 10)
+        run_blocking_mock = mocker.patch.object(aio_reader, "run_blocking")
+        data = asyncio.run(read_async(path, stream=True))
+        assert list(data["data"]) == FileReader(path).read()["data"]
+        run_blocking_mock.assert_not_called()
+
+    # Tests that a missing file raises the same error as FileReader.read().
+    def test_read_async_missing_file(self, tmp_path):
+        """
+        Tests that a missing file raises the FileNotFoundError FileReader.read() raises.
+        """
+        with pytest.raises(FileNotFoundError):
+            asyncio.run(read_async(tmp_path / "missing.srt"))
@@ -1,9 +1,12 @@
 
 # Generated by CodiumAI
+import asyncio
+import itertools
+import json
 import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # pylint: disable=import-error, wrong-import-position
-from audio.audio_extraction import AudioExtraction
+from audio.audio_extraction import AudioExtraction, ExtractJobQueue, _extract_one, extract_many, gc_partials, main
 from exceptions.exceptions import AudioExtractionError
 
 
@@ -19,13 +22,39 @@ The AudioExtraction class provides a simple interface for extracting audio from
 
 Methods:
 - __init__(self, input_video_file_path: str, output_audio_file_path: str) -> None: Initializes the class with the input video file path and output audio file path.
-- extract_audio(self) -> None: Extracts the audio track from the video file using ffmpeg. It first checks the available audio tracks in the video file and prompts the user to choose a language. It then maps the chosen language to a track number and extracts the audio track using ffmpeg. It also handles exceptions that may occur during the extraction process.
+- async extract_audio(self) -> None: Extracts the audio track from the video file using ffmpeg. It first checks the available audio tracks in the video file and prompts the user to choose a language. It then maps the chosen language to a track number and extracts the audio track using ffmpeg. It also handles exceptions that may occur during the extraction process.
 
 Fields:
 - input_video_file_path: str: Path of input video file.
 - output_audio_file_path: str: Path of output audio file.
 """
 
+def probe_output(*languages):
+    """
+    Builds the JSON that ffprobe prints for a video with one audio track per given language.
+    """
+    streams = [{"index": index, "tags": {"language": language}} for index, language in enumerate(languages, start=1)]
+    return json.dumps({"streams": streams}).encode('utf-8')
+
+def mock_subprocess(mocker, *outputs):
+    """
+    Mocks asyncio.create_subprocess_exec so spawned processes exit successfully with the given outputs, in order.
+    The last output is repeated for any further process, and ffmpeg creates the file it is asked to write.
+    """
+    processes = []
+    for stdout in outputs or (b'',):
+        process = mocker.Mock(returncode=0)
+        process.communicate = mocker.AsyncMock(return_value=(stdout, b''))
+        processes.append(process)
+    next_process = itertools.chain(processes, itertools.repeat(processes[-1]))
+
+    def create_subprocess_exec(*args, **kwargs):
+        if args[0] == 'ffmpeg' and args[-1] != 'pipe:1':
+            open(args[-1], 'wb').close()
+        return next(next_process)
+
+    return mocker.patch('asyncio.create_subprocess_exec', mocker.AsyncMock(side_effect=create_subprocess_exec))
+
 class TestAudioExtraction:
 
     # Tests that audio can be successfully extracted from a video file. 
@@ -35,9 +64,9 @@ class TestAudioExtraction:
         """
         input_video_file_path = "test_files/test_video.mp4"
         output_audio_file_path = "test_files/test_audio.wav"
-        mocker.patch('subprocess.check_output', return_value='1\r\neng\r\n')
+        mock_subprocess(mocker, probe_output('eng'))
         ae = AudioExtraction(input_video_file_path, output_audio_file_path)
-        ae.extract_audio()
+        asyncio.run(ae.extract_audio())
         assert os.path.exists(output_audio_file_path)
 
     # Tests that audio can be extracted from a video file with different language tracks. 
@@ -47,11 +76,10 @@ class TestAudioExtraction:
         """
         input_video_file_path = "test_files/test_video.mp4"
         output_audio_file_path = "test_files/test_audio.wav"
-        mocker.patch('subprocess.check_output', return_value='1\r\neng\r\n2\r\njpn\r\n3\r\nfr\r\n')
+        mock_subprocess(mocker, probe_output('eng', 'jpn', 'fr'))
         mocker.patch('builtins.input', return_value='jpn')
-        mocker.patch('subprocess.Popen', return_value=mocker.Mock(returncode=0))
         ae = AudioExtraction(input_video_file_path, output_audio_file_path)
-        ae.extract_audio()
+        asyncio.run(ae.extract_audio())
         assert os.path.exists(output_audio_file_path)
 
     # Tests that an AudioExtractionError is raised when attempting to extract audio from a video file with no audio tracks. 
@@ -61,10 +89,10 @@ class TestAudioExtraction:
         """
         input_video_file_path = "test_files/test_video.mp4"
         output_audio_file_path = "test_files/test_audio.wav"
-        mocker.patch('subprocess.check_output', return_value='')
+        mock_subprocess(mocker, probe_output())
         ae = AudioExtraction(input_video_file_path, output_audio_file_path)
         with pytest.raises(AudioExtractionError):
-            ae.extract_audio()
+            asyncio.run(ae.extract_audio())
 
     # Tests that an AudioExtractionError is raised when attempting to extract audio from a video file with an invalid language choice.  
     def test_extract_audio_with_invalid_language_choice(self, mocker):
@@ -72,12 +100,12 @@ class TestAudioExtraction:
         mocker.patch('builtins.input', return_value='invalid')
         ae = AudioExtraction('input_video.mp4', 'output_audio.wav')
         with pytest.raises(AudioExtractionError):
-            ae.extract_audio()
+            asyncio.run(ae.extract_audio())
 
     # Tests that audio can be successfully extracted from a large video file.  
     def test_extract_audio_with_large_video_files(self):
         ae = AudioExtraction('large_input_video.mp4', 'output_audio.wav')
-        ae.extract_audio()
+        asyncio.run(ae.extract_audio())
         # Assert that the output audio file exists and is not empty
         assert os.path.exists('output_audio.wav')
         assert os.path.getsize('output_audio.wav') > 0
@@ -87,7 +115,275 @@ class TestAudioExtraction:
         # Mock the input function to select the second audio track
         mocker.patch('builtins.input', return_value='jpn')
         ae = AudioExtraction('input_video.mp4', 'output_audio.wav')
-        ae.extract_audio()
+        asyncio.run(ae.extract_audio())
         # Assert that the output audio file exists and is not empty
         assert os.path.exists('output_audio.wav')
-        assert os.path.getsize('output_audio.wav') > 0
\ No newline at end of file
+        assert os.path.getsize('output_audio.wav') > 0
+
+    # Tests that extract_many runs ffprobe and ffmpeg for every input without going through a shell.
+    def test_extract_many_runs_every_file(self, mocker, tmp_path):
+        """
+        Tests that extract_many runs ffprobe and ffmpeg for every input without going through a shell.
+        """
+        paths = []
+        for name in ("first", "second"):
+            input_video_file = tmp_path / f"{name}.mkv"
+            input_video_file.write_bytes(b"")
+            paths.append((str(input_video_file), str(tmp_path / f"{name}.mka")))
+        create_subprocess_exec = mock_subprocess(mocker, probe_output('eng'))
+        prompt = mocker.patch('builtins.input')
+        asyncio.run(extract_many(paths, 'eng'))
+        prompt.assert_not_called()
+        programs = [call.args[0] for call in create_subprocess_exec.call_args_list]
+        assert sorted(programs) == ['ffmpeg', 'ffmpeg', 'ffprobe', 'ffprobe']
+        assert all('shell' not in call.kwargs for call in create_subprocess_exec.call_args_list)
+
+    # Tests that audio can be decoded into a NumPy array without writing an audio file.
+    def test_extract_audio_to_array(self, mocker, tmp_path):
+        """
+        Tests that audio can be decoded into a NumPy array without writing an audio file.
+        """
+        input_video_file = tmp_path / "video.mkv"
+        input_video_file.write_bytes(b"")
+        mock_subprocess(mocker, probe_output('eng'), b'\x01\x00\xff\xff')
+        mocker.patch('builtins.input', return_value='eng')
+        ae = AudioExtraction(str(input_video_file), str(tmp_path / "unused.wav"))
+        samples = asyncio.run(ae.extract_audio_to_array())
+        assert samples.tolist() == [1, -1]
+        assert list(tmp_path.iterdir()) == [input_video_file]
+
+    # Tests that an untagged audio track is offered as "und" and mapped by its stream index.
+    def test_extract_audio_with_untagged_track(self, mocker, tmp_path):
+        """
+        Tests that an untagged audio track is offered as "und" and mapped by its stream index.
+        """
+        input_video_file = tmp_path / "video.mkv"
+        input_video_file.write_bytes(b"")
+        create_subprocess_exec = mock_subprocess(mocker, json.dumps({"streams": [{"index": 2}]}).encode('utf-8'))
+        mocker.patch('builtins.input', return_value='und')
+        ae = AudioExtraction(str(input_video_file), str(tmp_path / "audio.mka"))
+        asyncio.run(ae.extract_audio())
+        ffmpeg_args = create_subprocess_exec.call_args_list[-1].args
+        assert ffmpeg_args[ffmpeg_args.index('-map') + 1] == '0:2'
+
+    # Tests that the fast path copies the track into a container matching its codec.
+    def test_extract_audio_fast_uses_codec_extension(self, mocker, tmp_path):
+        """
+        Tests that the fast path copies the track into a container matching its codec.
+        """
+        input_video_file = tmp_path / "My.Show.S01E01.mkv"
+        input_video_file.write_bytes(b"")
+        probe = {"streams": [{"index": 1, "codec_name": "aac", "tags": {"language": "eng"}}]}
+        create_subprocess_exec = mock_subprocess(mocker, json.dumps(probe).encode('utf-8'))
+        mocker.patch('builtins.input', return_value='eng')
+        ae = AudioExtraction(str(input_video_file), str(tmp_path / "My.Show.S01E01.wav"))
+        output_audio_file_path = asyncio.run(ae.extract_audio())
+        assert output_audio_file_path == str(tmp_path / "My.Show.S01E01.aac")
+        ffmpeg_args = create_subprocess_exec.call_args_list[-1].args
+        assert ffmpeg_args[ffmpeg_args.index('-c') + 1] == 'copy'
+        assert ffmpeg_args[-2:] == ('-y', output_audio_file_path + '.part')
+        assert sorted(os.listdir(tmp_path)) == ["My.Show.S01E01.aac", input_video_file.name]
+
+    # Tests that the WAV path resamples with as many filter threads as decoding threads.
+    def test_extract_audio_wav_uses_filter_threads(self, mocker, tmp_path):
+        """
+        Tests that the WAV path resamples with as many filter threads as decoding threads, like extract_audio_to_array.
+        """
+        input_video_file = tmp_path / "video.mkv"
+        input_video_file.write_bytes(b"")
+        create_subprocess_exec = mock_subprocess(mocker, probe_output('eng'))
+        ae = AudioExtraction(str(input_video_file), str(tmp_path / "audio.wav"), language="eng", threads=2)
+        asyncio.run(ae.extract_audio(fast=False))
+        ffmpeg_args = create_subprocess_exec.call_args_list[-1].args
+        assert ffmpeg_args[ffmpeg_args.index('-ar') + 1] == '16000'
+        assert ffmpeg_args[ffmpeg_args.index('-filter_threads') + 1] == '2'
+
+    # Tests that the job queue returns job ids right away and never runs more jobs than its concurrency.
+    def test_extract_job_queue_limits_concurrency(self, mocker):
+        """
+        Tests that the job queue returns job ids right away and never runs more jobs than its concurrency.
+        """
+        running, peak = 0, 0
+
+        async def extract_audio(self, fast=True):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return str(self.output_audio_file_path)
+
+        mocker.patch.object(AudioExtraction, 'extract_audio', extract_audio)
+
+        async def run():
+            async with ExtractJobQueue(concurrency=2) as queue:
+                job_ids = [await queue.submit(f"{i}.mkv", f"{i}.wav", "eng") for i in range(5)]
+                return [await queue.get_result(job_id) for job_id in job_ids]
+
+        assert asyncio.run(run()) == [f"{i}.wav" for i in range(5)]
+        assert peak == 2
+
+    # Tests that submitting waits while the job queue is full.
+    def test_extract_job_queue_pushes_back_when_full(self, mocker):
+        """
+        Tests that submitting waits while the job queue is full, and goes through once a running job finishes.
+        """
+        release = None
+
+        async def extract_audio(self, fast=True):
+            await release.wait()
+            return str(self.output_audio_file_path)
+
+        mocker.patch.object(AudioExtraction, 'extract_audio', extract_audio)
+
+        async def run():
+            nonlocal release
+            release = asyncio.Event()
+            async with ExtractJobQueue(concurrency=1, maxsize=1) as queue:
+                # One job running, one taken off the queue by the dispatcher and one waiting in it
+                job_ids = [await queue.submit(f"{i}.mkv", f"{i}.wav", "eng") for i in range(3)]
+                blocked = asyncio.create_task(queue.submit("3.mkv", "3.wav", "eng"))
+                await asyncio.sleep(0.01)
+                assert not blocked.done()
+                release.set()
+                job_ids.append(await blocked)
+                return [await queue.get_result(job_id) for job_id in job_ids]
+
+        assert asyncio.run(run()) == [f"{i}.wav" for i in range(4)]
+
+    # Tests that an extraction error is raised by get_result for its own job only.
+    def test_extract_job_queue_propagates_errors(self, mocker):
+        """
+        Tests that an extraction error is raised by get_result for its own job without affecting the others, and that a result can only be collected once.
+        """
+        async def extract_audio(self, fast=True):
+            if str(self.input_video_file_path) == "bad.mkv":
+                raise AudioExtractionError("Could not extract audio")
+            return str(self.output_audio_file_path)
+
+        mocker.patch.object(AudioExtraction, 'extract_audio', extract_audio)
+
+        async def run():
+            async with ExtractJobQueue(concurrency=2) as queue:
+                bad_job = await queue.submit("bad.mkv", "bad.wav", "eng")
+                good_job = await queue.submit("good.mkv", "good.wav", "eng")
+                with pytest.raises(AudioExtractionError):
+                    await queue.get_result(bad_job)
+                assert await queue.get_result(good_job) == "good.wav"
+                with pytest.raises(KeyError):
+                    await queue.get_result(good_job)
+
+        asyncio.run(run())
+
+    # Tests that ffmpeg writes to a partial file that is renamed once the extraction succeeds.
+    def test_extract_audio_renames_partial_file_on_success(self, mocker, tmp_path):
+        """
+        Tests that ffmpeg writes to a partial file next to the output, which is renamed to the output once the extraction succeeds.
+        """
+        input_video_file = tmp_path / "video.mkv"
+        input_video_file.write_bytes(b"")
+        create_subprocess_exec = mock_subprocess(mocker, probe_output('eng'))
+        ae = AudioExtraction(str(input_video_file), str(tmp_path / "audio.wav"), language='eng')
+        assert asyncio.run(ae.extract_audio(fast=False)) == str(tmp_path / "audio.wav")
+        assert create_subprocess_exec.call_args.args[-1] == str(tmp_path / "audio.wav.part")
+        assert sorted(os.listdir(tmp_path)) == ["audio.wav", "video.mkv"]
+
+    # Tests that a failed extraction leaves neither the output nor its partial file behind.
+    def test_extract_audio_deletes_partial_file_on_failure(self, mocker, tmp_path):
+        """
+        Tests that when ffmpeg fails after starting to write, the partial file is deleted and no output file is left behind.
+        """
+        input_video_file = tmp_path / "video.mkv"
+        input_video_file.write_bytes(b"")
+        probe = mocker.Mock(returncode=0)
+        probe.communicate = mocker.AsyncMock(return_value=(probe_output('eng'), b''))
+        ffmpeg = mocker.Mock(returncode=1)
+        ffmpeg.communicate = mocker.AsyncMock(return_value=(b'', b'Conversion failed!'))
+
+        def create_subprocess_exec(*args, **kwargs):
+            if args[0] == 'ffprobe':
+                return probe
+            open(args[-1], 'wb').close()
+            return ffmpeg
+
+        mocker.patch('asyncio.create_subprocess_exec', mocker.AsyncMock(side_effect=create_subprocess_exec))
+        ae = AudioExtraction(str(input_video_file), str(tmp_path / "audio.wav"), language='eng')
+        with pytest.raises(AudioExtractionError, match="Conversion failed!"):
+            asyncio.run(ae.extract_audio(fast=False))
+        assert os.listdir(tmp_path) == ["video.mkv"]
+
+    # Tests that only partial audio files older than the maximum age are deleted.
+    def test_gc_partials_deletes_stale_partial_files(self, tmp_path):
+        """
+        Tests that only partial audio files older than the maximum age are deleted.
+        """
+        stale, fresh, complete = tmp_path / "old.wav.part", tmp_path / "new.wav.part", tmp_path / "done.wav"
+        for path in (stale, fresh, complete):
+            path.write_bytes(b"")
+        os.utime(stale, (0, 0))
+        assert gc_partials(str(tmp_path), max_age_s=60) == 1
+        assert sorted(os.listdir(tmp_path)) == ["done.wav", "new.wav.part"]
+
+    # Tests that a missing output directory is reported as such, for a path given as a string.
+    def test_extract_audio_with_missing_output_directory(self, tmp_path):
+        """
+        Tests that a missing output directory is reported as such, for a path given as a string.
+        """
+        input_video_file = tmp_path / "video with spaces & quotes'.mkv"
+        input_video_file.write_bytes(b"")
+        ae = AudioExtraction(str(input_video_file), str(tmp_path / "missing" / "audio.wav"))
+        with pytest.raises(FileNotFoundError, match="Output directory not found"):
+            asyncio.run(ae.extract_audio())
+
+    # Tests that the default output audio file keeps every dot of the input video file name.
+    def test_default_output_audio_file_path(self):
+        """
+        Tests that the default output audio file keeps every dot of the input video file name.
+        """
+        ae = AudioExtraction(os.path.join("videos", "My.Show.S01E01.mkv"))
+        assert ae.output_audio_file_path.name == "My.Show.S01E01.wav"
+        assert ae.output_audio_file_path.parent.name == "videos"
+
+    # Tests that a batch worker reports a file without the requested language instead of raising.
+    def test_extract_one_with_missing_language_returns_none(self, mocker, tmp_path):
+        """
+        Tests that a batch worker reports a file without the requested language instead of raising, so one file cannot abort the whole batch.
+        """
+        input_video_file = tmp_path / "video.mkv"
+        input_video_file.write_bytes(b"")
+        mock_subprocess(mocker, probe_output('jpn'))
+        assert _extract_one(str(input_video_file), 'eng') is None
+
+    # Tests that a single file given on the command line is extracted in this process with every core.
+    def test_main_single_file_uses_every_core(self, mocker, tmp_path):
+        """
+        Tests that a single file given on the command line is extracted in this process, with ffmpeg free to use every core instead of a pool worker's share.
+        """
+        input_video_file = tmp_path / "video.mkv"
+        input_video_file.write_bytes(b"")
+        create_subprocess_exec = mock_subprocess(mocker, probe_output('eng'))
+        assert main([str(input_video_file), '--language', 'eng']) == 0
+        ffmpeg_args = [call.args for call in create_subprocess_exec.call_args_list if call.args[0] == 'ffmpeg'][0]
+        assert ffmpeg_args[ffmpeg_args.index('-threads') + 1] == '0'
+
+    # Tests that several files without a language are rejected before any extraction starts.
+    def test_main_several_files_require_a_language(self, mocker, tmp_path):
+        """
+        Tests that several files without a language are rejected as a usage error, since pool workers cannot answer the language prompt.
+        """
+        create_subprocess_exec = mock_subprocess(mocker, probe_output('eng'))
+        with pytest.raises(SystemExit) as exit_info:
+            main([str(tmp_path / "first.mkv"), str(tmp_path / "second.mkv")])
+        assert exit_info.value.code == 2
+        create_subprocess_exec.assert_not_called()
+
+    # Tests that directories are never deleted, even with a partial file's name.
+    def test_gc_partials_keeps_directories(self, tmp_path):
+        """
+        Tests that a stale directory whose name ends like a partial file is kept.
+        """
+        directory = tmp_path / "old.wav.part"
+        directory.mkdir()
+        os.utime(directory, (0, 0))
+        assert gc_partials(str(tmp_path), max_age_s=60) == 0
+        assert directory.is_dir()
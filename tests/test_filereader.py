@@ -0,0 +1,115 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # pylint: disable=import-error, wrong-import-position
+from file_handling.filereader import FileReader
+from exceptions.exceptions import FileReadError, SubtitleTypeNotRecognized
+
+import pytest
+
+"""
+Code Analysis
+
+Main functionalities:
+The FileReader class reads a subtitle file (.srt, .json or .jsonl) and returns its type and data. SRT files are decoded with the encoding detected from their start and parsed into srt.Subtitle objects, either all at once or as a stream.
+"""
+
+SRT_TEXT = (
+    "1\n00:00:01,000 --> 00:00:02,000\n“Hello” — it’s me.\n\n"
+    "2\n00:00:03,000 --> 00:00:04,500\nCafé, bientôt.\n\n"
+)
+
+def write_srt(tmp_path, encoding, text=SRT_TEXT, name="subtitle.srt"):
+    """
+    Writes an SRT file in the given encoding and returns its path.
+    """
+    path = tmp_path / name
+    path.write_bytes(text.encode(encoding))
+    return path
+
+class TestFileReader:
+
+    # Tests that SRT files are decoded correctly whatever encoding they were saved in.
+    @pytest.mark.parametrize("encoding", ["utf-8", "utf-8-sig", "utf-16", "utf-16-le", "utf-16-be", "cp1252"])
+    def test_read_srt_in_encoding(self, tmp_path, encoding):
+        """
+        Tests that SRT files are decoded correctly whatever encoding they were saved in, including cp1252 and UTF-16 without a byte order mark.
+        """
+        data = FileReader(write_srt(tmp_path, encoding)).read()
+        assert data["type"] == "SRT"
+        assert [subtitle.content for subtitle in data["data"]] == ["“Hello” — it’s me.", "Café, bientôt."]
+
+    # Tests that streaming an SRT file gives the same subtitles as reading it whole.
+    @pytest.mark.parametrize("encoding", ["utf-8", "utf-8-sig", "utf-16", "utf-16-le", "cp1252"])
+    @pytest.mark.parametrize("separator", ["\n\n", "\n\n\n", "\r\n\r\n\r\n"])
+    def test_iter_parse_matches_read(self, tmp_path, encoding, separator):
+        """
+        Tests that streaming an SRT file gives the same subtitles as reading it whole, whatever encoding it was saved in and however many blank lines, with LF or CRLF line breaks, separate its cues.
+        """
+        text = SRT_TEXT.replace("\n\n", separator)
+        if "\r" in separator:
+            text = text.replace("\r\n", "\n").replace("\n", "\r\n")
+        path = write_srt(tmp_path, encoding, text)
+        assert list(FileReader(path).iter_parse()) == FileReader(path).read()["data"]
+
+    # Tests that reading a file again after it changed returns its new contents.
+    def test_read_sees_changes_to_the_file(self, tmp_path):
+        """
+        Tests that the parse cache is keyed on the modification time, so reading a file again after it changed returns its new contents.
+        """
+        path = write_srt(tmp_path, "utf-8")
+        assert FileReader(path).read()["data"][0].content == "“Hello” — it’s me."
+        write_srt(tmp_path, "utf-8", SRT_TEXT.replace("Hello", "Goodbye"))
+        os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1_000_000_000))
+        assert FileReader(path).read()["data"][0].content == "“Goodbye” — it’s me."
+
+    # Tests that the subtitles read() returns can be edited without changing the cached ones.
+    def test_read_returns_copies(self, tmp_path):
+        """
+        Tests that the subtitles read() returns can be edited without changing what the next read() returns.
+        """
+        path = write_srt(tmp_path, "utf-8")
+        FileReader(path).read()["data"][0].content = "Edited"
+        assert FileReader(path).read()["data"][0].content == "“Hello” — it’s me."
+
+    # Tests that a cue whose text contains a blank line is streamed as one cue.
+    def test_iter_parse_keeps_blank_lines_inside_cues(self, tmp_path):
+        """
+        Tests that a blank line followed by text that does not start a new cue stays part of the cue, as with read().
+        """
+        path = write_srt(tmp_path, "utf-8", "1\n00:00:01,000 --> 00:00:02,000\nFirst line\n\nstill the first cue\n\n" + SRT_TEXT.replace("1\n", "2\n", 1).replace("2\n00:00:03", "3\n00:00:03"))
+        streamed = list(FileReader(path).iter_parse())
+        assert streamed == FileReader(path).read()["data"]
+        assert [subtitle.index for subtitle in streamed] == [1, 2, 3]
+
+    # Tests that a file type FileReader does not know is rejected.
+    def test_read_unknown_type(self, tmp_path):
+        """
+        Tests that a file type FileReader does not know is rejected, and that known types are matched case-insensitively.
+        """
+        path = tmp_path / "subtitle.txt"
+        path.write_text("text")
+        with pytest.raises(SubtitleTypeNotRecognized):
+            FileReader(path).read()
+        assert FileReader(write_srt(tmp_path, "utf-8", name="SUBTITLE.SRT")).read()["type"] == "SRT"
+
+    # Tests that an SRT file in an encoding that cannot be decoded is reported as a FileReadError.
+    def test_read_undecodable_utf8_with_bom(self, tmp_path):
+        """
+        Tests that a file with a UTF-8 byte order mark that is not valid UTF-8 is reported as a FileReadError.
+        """
+        path = tmp_path / "subtitle.srt"
+        path.write_bytes(b"\xef\xbb\xbf1\n00:00:01,000 --> 00:00:02,000\n\xff\xfe\n\n")
+        with pytest.raises(FileReadError):
+            FileReader(path).read()
+
+    # Tests that an SRT file in an encoding that is not supported is rejected rather than decoded as another one.
+    @pytest.mark.parametrize("encoding, text", [("cp1251", "Привет, как дела?"), ("shift_jis", "こんにちは、元気ですか？")])
+    def test_read_unsupported_encoding(self, tmp_path, encoding, text):
+        """
+        Tests that a cp1251 or Shift-JIS file is reported as a FileReadError, both by read() and iter_parse(), instead of passing for cp1252 or iso-8859-1.
+        """
+        path = write_srt(tmp_path, encoding, f"1\n00:00:01,000 --> 00:00:02,000\n{text}\n\n")
+        with pytest.raises(FileReadError):
+            FileReader(path).read()
+        with pytest.raises(FileReadError):
+            list(FileReader(path).iter_parse())
@@ -0,0 +1,312 @@
+import asyncio
+import os
+import sys
+from collections import OrderedDict
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # pylint: disable=import-error, wrong-import-position
+from subtitles import subtitle_translation
+from subtitles.subtitle_translation import SubtitleTranslation, _TranslationCache
+from exceptions.exceptions import TranslationError
+
+import pytest
+
+"""
+Code Analysis
+
+Main functionalities:
+The SubtitleTranslation class translates the captions of a subtitle file through MyMemory, batching, deduplicating and caching the texts it sends.
+
+The tests never reach the network: deep_translator's MyMemory module calls requests.get, which is mocked to answer from a function of the query.
+"""
+
+def mymemory_response(mocker, translated_text, status_code=200):
+    """
+    Builds a response like the ones MyMemory sends, without any other matches.
+    """
+    response = mocker.Mock(status_code=status_code)
+    response.json.return_value = {"responseData": {"translatedText": translated_text}, "matches": []}
+    return response
+
+def mock_mymemory(mocker, translate=str.upper):
+    """
+    Mocks the requests MyMemory receives, answering each query with translate(query).
+    Returns the mock, whose calls hold the query parameters that were sent.
+    """
+    mymemory = subtitle_translation._deep_translator().mymemory
+
+    def get(*args, params=None, **kwargs):
+        return mymemory_response(mocker, translate(params["q"]))
+
+    return mocker.patch.object(mymemory.requests, 'get', side_effect=get)
+
+@pytest.fixture(autouse=True)
+def empty_translation_cache(mocker):
+    """
+    Gives every test an empty translation cache, so no test sees another's translations.
+    """
+    mocker.patch.object(subtitle_translation, '_translation_cache', _TranslationCache(subtitle_translation.TRANSLATION_CACHE_SIZE))
+
+class TestSubtitleTranslation:
+
+    def test_language_codes_are_mapped_to_mymemory_locales(self):
+        """
+        Tests that ISO 639-1 codes, MyMemory locales and language names all map to the locale MyMemory expects.
+        """
+        assert subtitle_translation._mymemory_language('ja') == 'ja-JP'
+        assert subtitle_translation._mymemory_language('de') == 'de-DE'
+        assert subtitle_translation._mymemory_language('en-US') == 'en-US'
+        assert subtitle_translation._mymemory_language('japanese') == 'ja-JP'
+
+    def test_unsupported_language_raises_translation_error(self, mocker):
+        """
+        Tests that a language MyMemory does not know fails with a TranslationError before any request is sent.
+        """
+        get = mock_mymemory(mocker)
+        with pytest.raises(TranslationError):
+            SubtitleTranslation('xx', 'en', 'subtitle.srt').translate_batch(['Hello'])
+        get.assert_not_called()
+
+    def test_translate_batch_sends_mymemory_locales(self, mocker):
+        """
+        Tests that a language pair given as ISO 639-1 codes is sent to MyMemory as locales.
+        """
+        get = mock_mymemory(mocker)
+        assert SubtitleTranslation('ja', 'en', 'subtitle.srt').translate_batch(['konnichiwa']) == ['KONNICHIWA']
+        assert get.call_args.kwargs['params']['langpair'] == 'ja-JP|en-GB'
+
+    def test_group_texts_keeps_batches_below_the_length_limit(self):
+        """
+        Tests that grouped texts, joined by the separator, stay within the byte limit, and that a text too long on its own gets a group of its own.
+        """
+        texts = ['é' * 40] * 30 + ['x' * 600, 'short']
+        groups = subtitle_translation._group_texts(texts, subtitle_translation.MAX_BATCH_LENGTH, subtitle_translation.BATCH_SEPARATOR)
+        assert [text for group in groups for text in group] == texts
+        for group in groups:
+            assert len(group) <= subtitle_translation.MAX_BATCH_SIZE
+            if len(group) > 1:
+                assert len(subtitle_translation.BATCH_SEPARATOR.join(group).encode('utf-8')) <= subtitle_translation.MAX_BATCH_LENGTH
+        assert ['x' * 600] in groups
+
+    def test_empty_translation_is_retried_then_raises_translation_error(self, mocker):
+        """
+        Tests that a text MyMemory answers without a translation for is retried, and fails with a TranslationError once the retries are used up.
+        """
+        sleep = mocker.patch.object(subtitle_translation.time, 'sleep')
+        get = mock_mymemory(mocker, translate=lambda text: '')
+        with pytest.raises(TranslationError):
+            SubtitleTranslation('en', 'fr', 'subtitle.srt').translate_batch(['BAD one'])
+        assert get.call_count == subtitle_translation.TRANSLATION_ATTEMPTS
+        assert sleep.call_count == subtitle_translation.TRANSLATION_ATTEMPTS - 1
+
+    def test_untranslatable_text_is_kept_when_asked(self, mocker):
+        """
+        Tests that with keep_untranslated a text without a translation is kept as it is, recorded and not cached, while the rest of its batch is translated.
+        """
+        mocker.patch.object(subtitle_translation.time, 'sleep')
+        mock_mymemory(mocker, translate=lambda text: '' if 'BAD' in text else text.upper())
+        translator = SubtitleTranslation('en', 'fr', 'subtitle.srt', keep_untranslated=True)
+        assert translator.translate_batch(['Hello', 'BAD one', 'Hello']) == ['HELLO', 'BAD one', 'HELLO']
+        assert translator.untranslated == ['BAD one']
+        assert subtitle_translation._translation_cache.get_many('en', 'fr', ['Hello', 'BAD one']) == {'Hello': 'HELLO'}
+
+    def test_throttled_request_is_retried(self, mocker):
+        """
+        Tests that a request MyMemory throttles is sent again after a delay.
+        """
+        mocker.patch.object(subtitle_translation.time, 'sleep')
+        mymemory = subtitle_translation._deep_translator().mymemory
+        get = mocker.patch.object(mymemory.requests, 'get', side_effect=[
+            mymemory_response(mocker, None, status_code=429),
+            mymemory_response(mocker, 'HELLO'),
+        ])
+        assert SubtitleTranslation('en', 'fr', 'subtitle.srt').translate_batch(['Hello']) == ['HELLO']
+        assert get.call_count == 2
+
+    def test_translate_batch_sends_one_request_per_batch(self, mocker):
+        """
+        Tests that short texts are joined into a single request, and that repeated texts are sent once.
+        """
+        get = mock_mymemory(mocker)
+        texts = ['Yes.', 'No.', 'Yes.', 'Maybe.']
+        assert SubtitleTranslation('en', 'fr', 'subtitle.srt').translate_batch(texts) == ['YES.', 'NO.', 'YES.', 'MAYBE.']
+        assert get.call_count == 1
+        assert get.call_args.kwargs['params']['q'].count('###SEP###') == 2
+
+    def test_lost_separators_fall_back_to_one_request_per_text(self, mocker):
+        """
+        Tests that a batch whose separators do not survive the translation is translated again one text at a time.
+        """
+        get = mock_mymemory(mocker, translate=lambda text: text.replace('###SEP###', '').upper())
+        assert SubtitleTranslation('en', 'fr', 'subtitle.srt').translate_batch(['Yes.', 'No.']) == ['YES.', 'NO.']
+        assert get.call_count == 3
+
+    @pytest.mark.parametrize('text', ['', '♪♪', '...', '1984', '<i></i>', '<i>♪</i>', '{\\an8}...', '<font color="#ffffff">- 12</font>'])
+    def test_texts_without_letters_are_not_sent(self, mocker, text):
+        """
+        Tests that texts without any letters outside their formatting tags are kept as they are without a request.
+        """
+        get = mock_mymemory(mocker)
+        assert SubtitleTranslation('en', 'fr', 'subtitle.srt').translate_batch([text]) == [text]
+        get.assert_not_called()
+
+    def test_text_inside_tags_is_translated(self, mocker):
+        """
+        Tests that text with letters inside its formatting tags is still translated.
+        """
+        mock_mymemory(mocker)
+        assert SubtitleTranslation('en', 'fr', 'subtitle.srt').translate_batch(['<i>Hello</i>']) == ['<I>HELLO</I>']
+
+    def test_translations_are_cached_per_language_pair(self, mocker):
+        """
+        Tests that a text translated before is not sent again for the same language pair, but is for another one.
+        """
+        get = mock_mymemory(mocker)
+        SubtitleTranslation('en', 'fr', 'subtitle.srt').translate_batch(['Hello'])
+        SubtitleTranslation('en', 'fr', 'subtitle.srt').translate_batch(['Hello'])
+        assert get.call_count == 1
+        SubtitleTranslation('en', 'de', 'subtitle.srt').translate_batch(['Hello'])
+        assert get.call_count == 2
+
+    def test_translation_cache_evicts_least_recently_used(self):
+        """
+        Tests that the translation cache keeps at most maxsize translations, dropping the least recently used first.
+        """
+        cache = _TranslationCache(2)
+        cache.put_many('en', 'fr', {'a': 'A', 'b': 'B'})
+        assert cache.get_many('en', 'fr', ['a']) == {'a': 'A'}
+        cache.put_many('en', 'fr', {'c': 'C'})
+        assert cache.get_many('en', 'fr', ['a', 'b', 'c']) == {'a': 'A', 'c': 'C'}
+
+    def test_translate_and_save(self, mocker, tmp_path):
+        """
+        Tests that translate() translates every subtitle of an SRT file and that save() writes them back as SRT.
+        """
+        mock_mymemory(mocker)
+        srt_file = tmp_path / 'subtitle.srt'
+        srt_file.write_text('1\n00:00:01,000 --> 00:00:02,000\nHello\n\n2\n00:00:03,000 --> 00:00:04,000\n♪\n\n', encoding='utf-8')
+        translator = SubtitleTranslation('en', 'fr', str(srt_file))
+        translator.translate()
+        translator.save(str(tmp_path / 'translated.srt'))
+        assert (tmp_path / 'translated.srt').read_text(encoding='utf-8') == '1\n00:00:01,000 --> 00:00:02,000\nHELLO\n\n2\n00:00:03,000 --> 00:00:04,000\n♪\n\n'
+
+    def test_save_async_writes_the_same_file_as_save(self, mocker, tmp_path):
+        """
+        Tests that save_async() writes the same SRT file as save().
+        """
+        mock_mymemory(mocker)
+        srt_file = tmp_path / 'subtitle.srt'
+        srt_file.write_text('1\n00:00:01,000 --> 00:00:02,000\nHello\n\n', encoding='utf-8')
+        translator = SubtitleTranslation('en', 'fr', str(srt_file))
+        translator.translate()
+        translator.save(str(tmp_path / 'translated.srt'))
+        asyncio.run(translator.save_async(str(tmp_path / 'translated_async.srt')))
+        assert (tmp_path / 'translated_async.srt').read_bytes() == (tmp_path / 'translated.srt').read_bytes()
+
+    def test_obvious_language_is_recognised_from_stopwords(self, mocker):
+        """
+        Tests that text whose stopwords clearly belong to one language is recognised without running langdetect.
+        """
+        factory = mocker.patch.object(subtitle_translation, '_langdetect_factory')
+        text = "What is that? I have not seen it. You and I know this was the one, and it is with the others. " * 2
+        assert subtitle_translation._run_language_detection(text, 'en') == 'en'
+        factory.assert_not_called()
+
+    @pytest.mark.parametrize('text', ['Hello there, how are you?', 'Buenos días, the house is la casa y el perro está con the cat and el gato es muy bueno y para you lo que no'])
+    def test_short_or_mixed_text_is_not_guessed_from_stopwords(self, text):
+        """
+        Tests that the stopword guess gives no answer for text that is too short or has no clearly dominant language, leaving it to a detector.
+        """
+        assert subtitle_translation._guess_language_from_stopwords(text) is None
+
+    def test_langdetect_factory_loads_only_the_given_profiles(self):
+        """
+        Tests that the langdetect factory only loads the profiles it is given, skipping names without a profile.
+        """
+        factory = subtitle_translation._langdetect_factory(frozenset({'en', 'fr', 'xx'}))
+        assert sorted(factory.get_lang_list()) == ['en', 'fr']
+
+    @pytest.mark.parametrize('text, expected_language, profiles', [
+        ('Hej, hur mår du idag? Jag mår bra, tack.', 'sv', {'sv'}),
+        ('你今天好吗？我很好，谢谢。', 'zh', {'zh-cn', 'zh-tw'}),
+    ])
+    def test_expected_language_profile_is_loaded(self, mocker, text, expected_language, profiles):
+        """
+        Tests that the profile of the expected language is loaded on top of the default ones, so a language outside them is still recognised, with Chinese reported as its ISO 639-1 code.
+        """
+        factory = mocker.spy(subtitle_translation, '_langdetect_factory')
+        assert subtitle_translation._run_language_detection(text, expected_language) == expected_language
+        assert factory.call_args.args[0] == subtitle_translation.LANGDETECT_PROFILES | {expected_language} | profiles
+
+    def test_detection_results_are_cached(self, mocker):
+        """
+        Tests that detecting the language of the same text again does not run the detection again, unless the expected language differs.
+        """
+        mocker.patch.object(subtitle_translation, '_detection_cache', OrderedDict())
+        detection = mocker.patch.object(subtitle_translation, '_run_language_detection', return_value='en')
+        assert subtitle_translation._detect_language('Hello there', 'en') == 'en'
+        assert subtitle_translation._detect_language('Hello there', 'en') == 'en'
+        assert detection.call_count == 1
+        subtitle_translation._detect_language('Hello there', 'fr')
+        assert detection.call_count == 2
+
+    def test_detection_cache_is_bounded_and_keys_long_texts_by_digest(self, mocker):
+        """
+        Tests that the detection cache keeps at most DETECTION_CACHE_SIZE results, dropping the oldest first, and that long texts sharing a start are cached apart under their digest.
+        """
+        cache = mocker.patch.object(subtitle_translation, '_detection_cache', OrderedDict())
+        mocker.patch.object(subtitle_translation, 'DETECTION_CACHE_SIZE', 2)
+        detection = mocker.patch.object(subtitle_translation, '_run_language_detection', side_effect=['en', 'fr', 'de'])
+        long_text = 'x' * subtitle_translation.DETECTION_KEY_LENGTH
+        for text in ('short', long_text + 'a', long_text + 'b'):
+            subtitle_translation._detect_language(text)
+        assert detection.call_count == 3
+        assert list(cache.values()) == ['fr', 'de']
+        assert all(isinstance(text_key, bytes) for text_key, _, _ in cache)
+
+    def test_language_is_only_verified_when_asked(self, mocker, tmp_path):
+        """
+        Tests that translate() does not detect the subtitle language unless verify_language is set.
+        """
+        mock_mymemory(mocker)
+        detect = mocker.patch.object(subtitle_translation, '_detect_language')
+        srt_file = tmp_path / 'subtitle.srt'
+        srt_file.write_text('1\n00:00:01,000 --> 00:00:02,000\nHello\n\n', encoding='utf-8')
+        SubtitleTranslation('en', 'fr', str(srt_file)).translate()
+        detect.assert_not_called()
+
+    def test_verified_language_must_match_the_source_language(self, mocker, tmp_path):
+        """
+        Tests that with verify_language, subtitles not in the source language fail with a TranslationError before any request is sent, while matching ones are translated, whatever form the source language was given in.
+        """
+        get = mock_mymemory(mocker)
+        detect = mocker.patch.object(subtitle_translation, '_detect_language', return_value='en')
+        srt_file = tmp_path / 'subtitle.srt'
+        srt_file.write_text('1\n00:00:01,000 --> 00:00:02,000\nHello\n\n', encoding='utf-8')
+        with pytest.raises(TranslationError):
+            SubtitleTranslation('de', 'fr', str(srt_file), verify_language=True).translate()
+        get.assert_not_called()
+        translator = SubtitleTranslation('en-US', 'fr', str(srt_file), verify_language=True)
+        translator.translate()
+        assert detect.call_args.args == ('Hello', 'en')
+        assert [subtitle.content for subtitle in translator.srt_file] == ['HELLO']
+
+    def test_fasttext_model_is_used_when_configured(self, mocker):
+        """
+        Tests that a configured fasttext model decides the language of text the stopwords leave open.
+        """
+        mocker.patch.dict(os.environ, {subtitle_translation.FASTTEXT_MODEL_ENV: 'lid.176.ftz'})
+        model = mocker.Mock()
+        model.predict.return_value = (['__label__sv'], [0.9])
+        load = mocker.patch.object(subtitle_translation, '_load_language_model', return_value=model)
+        assert subtitle_translation._run_language_detection('Hej, hur mår du?\nBra, tack.', 'sv') == 'sv'
+        load.assert_called_once_with('lid.176.ftz')
+        assert model.predict.call_args.args[0] == 'Hej, hur mår du? Bra, tack.'
+
+    def test_langdetect_is_used_when_fasttext_is_missing(self, mocker):
+        """
+        Tests that a configured fasttext model is ignored when fasttext is not installed, falling back to langdetect.
+        """
+        mocker.patch.dict(os.environ, {subtitle_translation.FASTTEXT_MODEL_ENV: 'lid.176.ftz'})
+        mocker.patch.dict(sys.modules, {'fasttext': None})
+        subtitle_translation._load_language_model.cache_clear()
+        assert subtitle_translation._run_language_detection('Hej, hur mår du idag? Jag mår bra, tack.', 'sv') == 'sv'
+        subtitle_translation._load_language_model.cache_clear()